@@ -154,8 +154,7 @@ class MissionExecutor:
         Waits until the executor is idle.
         This method is mostly a helper for tests to wait for mission completion.
         """
-        self.is_idle.wait(timeout)
-        return self.is_idle.is_set()
+        return self.is_idle.wait(timeout)
 
     def cancel_mission(self, mission_id):
         with self.mutex:
@@ -522,7 +521,7 @@ class MissionStepNavigateTo(Step):
             angularRadians=tolerance["angularRadians"],
         )
         self.mission = None
-        self.canceled = False
+        self.canceled_event = threading.Event()
 
     def _go_to_waypoint(self):
         if self.mission is None:
@@ -543,12 +542,11 @@ class MissionStepNavigateTo(Step):
     def execute(self, mission):
         self.mission = mission
         self._go_to_waypoint()
-        while True:
-            if mission.robot_session.reached_waypoint(self.waypoint, self.tolerance):
-                return
-            if self.canceled:
+        while not mission.robot_session.reached_waypoint(self.waypoint, self.tolerance):
+            # Check the robot pose every second, stopping as soon as the step
+            # is canceled
+            if self.canceled_event.wait(1):
                 return
-            time.sleep(1)
 
     def pause(self):
         # It's up to the integrator to handle pause to avoid the robot from moving
@@ -565,8 +563,12 @@ class MissionStepNavigateTo(Step):
             step_def.get("timeoutMs", defaultTimeoutMs),
         )
 
+    @property
+    def canceled(self):
+        return self.canceled_event.is_set()
+
     def cancel(self):
-        self.canceled = True
+        self.canceled_event.set()
         super().cancel()
 
     def success(self):
@@ -5,14 +5,18 @@
 
 # Standard
 import os
+import re
 from typing import Optional
 
 # Third-party
-from pydantic import BaseModel, AnyUrl, field_validator, HttpUrl
+from pydantic import BaseModel, AnyUrl, Field, field_validator, HttpUrl
 
 # InOrbit
 from inorbit_edge.robot import INORBIT_CLOUD_SDK_ROBOT_CONFIG_URL, INORBIT_REST_API_URL
 
+# Matches any whitespace character. Used to validate identifiers and keys.
+_WHITESPACE_REGEX = re.compile(r"\s")
+
 
 class CameraConfig(BaseModel):
     """A class representing a camera configuration model.
@@ -107,13 +111,20 @@ class RobotSessionModel(BaseModel):
     robot_id: str
     robot_name: str
     robot_key: Optional[str] = None
-    api_key: Optional[str] = os.getenv("INORBIT_API_KEY")
-    use_ssl: bool = os.environ.get("INORBIT_USE_SSL", "true").lower() == "true"
-    endpoint: HttpUrl = os.environ.get(
-        "INORBIT_API_URL", INORBIT_CLOUD_SDK_ROBOT_CONFIG_URL
+    api_key: Optional[str] = Field(default_factory=lambda: os.getenv("INORBIT_API_KEY"))
+    use_ssl: bool = Field(
+        default_factory=lambda: os.environ.get("INORBIT_USE_SSL", "true").lower()
+        == "true"
+    )
+    endpoint: HttpUrl = Field(
+        default_factory=lambda: os.environ.get(
+            "INORBIT_API_URL", INORBIT_CLOUD_SDK_ROBOT_CONFIG_URL
+        )
     )
-    rest_api_endpoint: Optional[HttpUrl] = os.environ.get(
-        "INORBIT_REST_API_URL", INORBIT_REST_API_URL
+    rest_api_endpoint: Optional[HttpUrl] = Field(
+        default_factory=lambda: os.environ.get(
+            "INORBIT_REST_API_URL", INORBIT_REST_API_URL
+        )
     )
     account_id: Optional[str] = None
 
@@ -133,6 +144,6 @@ class RobotSessionModel(BaseModel):
         Returns:
             str: The given value if it does not contain whitespaces
         """
-        if value and any(char.isspace() for char in value):
+        if value and _WHITESPACE_REGEX.search(value):
             raise ValueError("Whitespaces are not allowed")
         return value
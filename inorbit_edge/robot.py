@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+import functools
 import io
 from dataclasses import dataclass, field, asdict
 import json
@@ -19,12 +20,9 @@ import yaml
 
 from inorbit_edge.inorbit_pb2 import (
     CustomDataMessage,
-    KeyValueCustomElement,
     LocationAndPoseMessage,
     OdometryDataMessage,
     LaserMessage,
-    PathPoint,
-    RobotPath,
     PathDataMessage,
     Echo,
     CustomScriptCommandMessage,
@@ -141,32 +139,46 @@ class RobotMap:
     _last_dimensions: Tuple[int, int] = None
     _last_pixels: bytes = None
 
-    def _refresh_data(self):
-        """Read the image file and update the in memory map data."""
+    @staticmethod
+    @functools.lru_cache(maxsize=4)
+    def _read_image_file(file, last_modified_time):
+        """Read an image file and return its PNG bytes, hash and dimensions.
+
+        Results are cached by file path and modification time, so maps sharing
+        the same file (e.g. one per robot session) only read and encode it once.
+        """
 
         try:
-            # Open the image file
-            img = Image.open(self.file)
             # Verify opens and reads the entire image file
-            img.verify()
+            with Image.open(file) as img:
+                img.verify()
         except IOError as e:
-            logging.getLogger(__class__.__name__).error(
-                f"{self.file} is not accessible."
-            )
+            logging.getLogger(__class__.__name__).error(f"{file} is not accessible.")
             raise e
 
-        # img.verify() closes the file, reload it now that its validated
-        img = Image.open(self.file)
+        # img.verify() leaves the image unusable, reload it now that its validated
+        with Image.open(file) as img:
+            # Create a BytesIO object
+            img_byte_arr = io.BytesIO()
+            img.save(img_byte_arr, format="PNG")
+            dimensions = (img.width, img.height)
 
-        # Create a BytesIO object
-        img_byte_arr = io.BytesIO()
-        img.save(img_byte_arr, format="PNG")
+        pixels = img_byte_arr.getvalue()
+        return pixels, hash(tuple(pixels)), dimensions
+
+    def _refresh_data(self):
+        """Read the image file and update the in memory map data."""
+
+        last_modified_time = os.path.getmtime(self.file)
+        pixels, data_hash, dimensions = self._read_image_file(
+            self.file, last_modified_time
+        )
 
         # Refresh values
-        self._last_pixels = img_byte_arr.getvalue()
-        self._last_dimensions = (img.width, img.height)
-        self._last_modified_time = os.path.getmtime(self.file)
-        self._last_hash = hash(tuple(self._last_pixels))
+        self._last_pixels = pixels
+        self._last_dimensions = dimensions
+        self._last_modified_time = last_modified_time
+        self._last_hash = data_hash
 
     def get_image_data(self) -> Tuple[bytes, int, Tuple[int, int]]:
         """Read a map file and return it as a byte stream. Throws an error if the file
@@ -196,6 +208,8 @@ class RobotSession:
                 Defaults: INORBIT_REST_API_URL.
             account_id (str): The account ID of the robot owner. Required for applying
                 configurations to the robot.
+            http_session (requests.Session): Session used for HTTP requests to
+                InOrbit Cloud services. Defaults: a new session.
         """
 
         self.api_key = api_key
@@ -222,6 +236,17 @@ class RobotSession:
         )
         # Account the robot belongs to. Used for REST API calls.
         self.account_id = kwargs.get("account_id")
+        # HTTP session for REST API calls. Reusing it keeps connections alive
+        # between requests instead of opening a new one per call.
+        self._http_session = kwargs.get("http_session")
+        # Sessions created here are owned by this robot session and closed on
+        # disconnect. Sessions provided by the caller may be shared with others.
+        self._owns_http_session = self._http_session is None
+        if self._owns_http_session:
+            self._http_session = requests.Session()
+        # Headers for authenticating REST API calls. They don't change during the
+        # session so they are built once and shared between requests.
+        self._rest_api_headers = {"x-auth-inorbit-app-key": f"{self.api_key}"}
 
         # Use TCP transport by default. The client will use websockets
         # transport if the environment variable HTTP_PROXY is set.
@@ -290,6 +315,9 @@ class RobotSession:
         self.message_handlers[MQTT_IN_CMD] = self._handle_in_cmd
         self.message_handlers[MQTT_MAP_REQ] = self._handle_mapreq
 
+        # Robot topics by subtopic, built on first use by ``_get_robot_subtopic``
+        self._robot_topics = {}
+
         # Internal variables for configuring throttling
         # The throttling is done by method instead of by topic because the same topic
         # might be used for sending different type of messages e.g. pose and laser.
@@ -336,12 +364,16 @@ class RobotSession:
         Returns:
             str: robot topic.
         """
-        if subtopic.startswith("/"):
-            raise ValueError("Subtopic shouldn't start with '/'.")
+        topic = self._robot_topics.get(subtopic)
+        if topic is None:
+            if subtopic.startswith("/"):
+                raise ValueError("Subtopic shouldn't start with '/'.")
 
-        return "r/{robot_id}/{subtopic}".format(
-            robot_id=self.robot_id, subtopic=subtopic
-        )
+            topic = "r/{robot_id}/{subtopic}".format(
+                robot_id=self.robot_id, subtopic=subtopic
+            )
+            self._robot_topics[subtopic] = topic
+        return topic
 
     def _should_publish_message(self, method, key=None):
         """Determine if the method should be executed or not
@@ -383,10 +415,11 @@ class RobotSession:
         time_diff = current_ts - throttling_cfg["last_ts"]
         if time_diff < throttling_cfg["min_time_between_calls"]:
             self.logger.debug(
-                (
-                    "Ignoring message '{}' (robot '{}'). Last "
-                    "message was sent {:.4f} seconds ago."
-                ).format(method, self.robot_id, time_diff)
+                "Ignoring message '%s' (robot '%s'). Last "
+                "message was sent %.4f seconds ago.",
+                method,
+                self.robot_id,
+                time_diff,
             )
             return False
 
@@ -411,7 +444,7 @@ class RobotSession:
             params["appKey"] = self.api_key
 
         # post request to fetch robot config
-        response = requests.post(self.endpoint, data=params)
+        response = self._http_session.post(self.endpoint, data=params)
         response.raise_for_status()
 
         # TODO: validate fetched config
@@ -473,9 +506,11 @@ class RobotSession:
 
         try:
             self._send_echo(msg.topic, msg.payload)
-            subtopic = "/".join(msg.topic.split("/")[2:])
-            if subtopic in self.message_handlers:
-                self.message_handlers[subtopic](msg.payload)
+            # Topics look like r/<robot_id>/<subtopic>, split the prefix off once
+            subtopic = "".join(msg.topic.split("/", 2)[2:])
+            handler = self.message_handlers.get(subtopic)
+            if handler:
+                handler(msg.payload)
         except UnicodeDecodeError as ex:
             self.logger.error(
                 f"Failed to decode message, ignoring. Payload: '{msg.payload}'. {ex}"
@@ -517,12 +552,13 @@ class RobotSession:
     def _handle_pose_msg_helper(self, msg, cmd):
         """A helper to abstract handling pose messages."""
 
-        args = msg.decode("utf-8").split("|")
-        seq = args[0]
-        ts = args[1]  # noqa: F841
-        x = args[2]
-        y = args[3]
-        theta = args[4]
+        # Split the raw payload and only decode the fields that are handed over;
+        # the timestamp is ignored.
+        args = msg.split(b"|")
+        seq = args[0].decode("utf-8")
+        x = args[2].decode("utf-8")
+        y = args[3].decode("utf-8")
+        theta = args[4].decode("utf-8")
 
         # Hand over to callback for processing, using the proper format
         self.dispatch_command(
@@ -789,12 +825,14 @@ class RobotSession:
         the program will be executed prepending the provided `path`.
         """
 
+        exec_name_pattern = re.compile(exec_name_regex)
+
         def handler(command_name, args, options):
             if command_name != COMMAND_CUSTOM_COMMAND:
                 return
             script_name = args[0]
             script_args = args[1]
-            if re.match(exec_name_regex, script_name):
+            if exec_name_pattern.match(script_name):
                 # TODO(mike) handle script return and output
                 try:
                     subprocess.Popen(
@@ -989,14 +1027,19 @@ class RobotSession:
 
         self.client.disconnect()
 
-        self._wait_for_connection_state(self._is_disconnected)
+        try:
+            self._wait_for_connection_state(self._is_disconnected)
+        finally:
+            # Release the pooled HTTP connections, even if disconnection timed out
+            if self._owns_http_session:
+                self._http_session.close()
 
     def publish(self, topic, message, qos=0, retain=False):
         """MQTT client wrapper method for publishing messages
 
         Args:
             topic (str): Topic where the message will be published.
-            message (bytearray, str): The actual message to send.
+            message (bytes, bytearray, str): The actual message to send.
             qos (int, optional): The quality of service level to use. Defaults to 0.
             retain (bool, optional): If set to true, the message will be set as
                 the "last known good"/retained message for the topic. Defaults to False.
@@ -1033,14 +1076,14 @@ class RobotSession:
                 the "last known good"/retained message for the topic. Defaults to False.
         """
         topic = self._get_robot_subtopic(subtopic=subtopic)
-        self.logger.debug("Publishing to topic {}".format(topic))
+        self.logger.debug("Publishing to topic %s", topic)
         ret = self.publish(
             topic,
-            bytearray(message.SerializeToString()),
+            message.SerializeToString(),
             qos=qos,
             retain=retain,
         )
-        self.logger.debug("Return code: {}".format(ret))
+        self.logger.debug("Return code: %s", ret)
 
     def publish_pose(self, x, y, yaw, frame_id="map", ts=None):
         """Publish robot pose
@@ -1086,27 +1129,18 @@ class RobotSession:
             is_event (bool): Events are not throttled
         """
 
-        def convert_value(value):
-            if isinstance(value, object):
-                return json.dumps(value)
-            else:
-                return str(value)
-
-        def set_pairs(k):
-            item = KeyValueCustomElement()
-            item.key = k
-            item.value = convert_value(key_values[k])
-            return item
-
         msg = CustomDataMessage()
         msg.custom_field = custom_field
 
-        for key in key_values.keys():
+        # Every value is sent JSON encoded. Pairs are added in place to the message
+        # instead of being built separately and copied into it.
+        pairs = msg.key_value_payload.pairs
+        for key, value in key_values.items():
             if not is_event and not self._should_publish_message(
                 method="publish_key_values", key=key
             ):
                 pass
-            msg.key_value_payload.pairs.append(set_pairs(key))
+            pairs.add(key=key, value=json.dumps(value))
 
         self.publish_protobuf(MQTT_SUBTOPIC_CUSTOM_DATA, msg)
 
@@ -1305,26 +1339,21 @@ class RobotSession:
                 )
             )
 
-        # Generate ``PathPoint`` protobuf messages
-        # from the list of path point tuples
-        pb_path_points = [
-            PathPoint(x=path_point[0], y=path_point[1])
-            for path_point in path_points[:ROBOT_PATH_POINTS_LIMIT]
-        ]
-
-        # Generate a ``RobotPath`` protobuf message and
-        # add the list of ``PathPoint`` created above
-        pb_robot_path = RobotPath()
-        pb_robot_path.ts = ts if ts else int(time.time() * 1000)
+        ts = ts if ts else int(time.time() * 1000)
+
+        # Generate the ``PathDataMessage`` and build its ``RobotPath`` in place,
+        # adding a ``PathPoint`` for each of the path point tuples
+        msg = PathDataMessage()
+        msg.ts = ts
+        pb_robot_path = msg.paths.add()
+        pb_robot_path.ts = ts
         pb_robot_path.path_id = path_id
         pb_robot_path.frame_id = frame_id
-        pb_robot_path.points.extend(pb_path_points)
+        pb_path_points = pb_robot_path.points
+        for path_point in path_points[:ROBOT_PATH_POINTS_LIMIT]:
+            pb_path_points.add(x=path_point[0], y=path_point[1])
 
         # Publish ``PathDataMessage``
-        msg = PathDataMessage()
-        msg.ts = ts if ts else int(time.time() * 1000)
-        msg.paths.append(pb_robot_path)
-
         self.publish_protobuf(MQTT_SUBTOPIC_PATH, msg)
 
     def apply_footprint(self, spec: RobotFootprintSpec):
@@ -1361,10 +1390,10 @@ class RobotSession:
             "spec": asdict(spec),
         }
 
-        res = requests.post(
+        res = self._http_session.post(
             f"{self.inorbit_rest_api_endpoint}/configuration/apply",
             json=body,
-            headers={"x-auth-inorbit-app-key": f"{self.api_key}"},
+            headers=self._rest_api_headers,
         )
         res.raise_for_status()
 
@@ -1381,6 +1410,10 @@ class RobotSessionFactory:
         self.robot_session_kw_args = robot_session_kw_args
         self.command_callbacks = []
         self.commands_paths_rules = []
+        # HTTP session shared by all robot sessions built by this factory. It is
+        # closed by RobotSessionPool.tear_down(); callers using the factory
+        # directly own it and should close it when done.
+        self.http_session = requests.Session()
 
     def build(self, robot_id, robot_name="", **robot_config):
         """Builds a RobotSession object using the provided id and name.
@@ -1389,7 +1422,13 @@ class RobotSessionFactory:
         """
 
         session = RobotSession(
-            robot_id, robot_name, **{**robot_config, **self.robot_session_kw_args}
+            robot_id,
+            robot_name,
+            **{
+                "http_session": self.http_session,
+                **robot_config,
+                **self.robot_session_kw_args,
+            },
         )
 
         def build_callback(callback):
@@ -1454,33 +1493,40 @@ class RobotSessionPool:
 
     def get_session(self, robot_id, robot_name=""):
         """Returns a connected RobotSession for the specified robot"""
+        # Sessions are only added to the pool once connected, so existing
+        # sessions can be returned without taking the mutex
+        robot_session = self.robot_sessions.get(robot_id)
+        if robot_session is not None:
+            return robot_session
+
         # mutex to avoid the case of asking for the same robot twice and
         # opening 2 connections
-        self.getting_session_mutex.acquire()
-        # The `get_session` method might be called multiple times. Only create
-        # connection and register callbacks for new robot sessions.
-        new_robot_session = not self.has_robot(robot_id)
-        try:
-            if new_robot_session:
-                # Get the config params for this robot_id
-                robot_config = self.robot_config.get(robot_id, {})
-                # If there is no robot name in the config yaml, use the one
-                # provided to this method.
-                if not robot_config.get("robot_name"):
-                    robot_config["robot_name"] = robot_name
-                self.robot_sessions[robot_id] = self.robot_session_factory.build(
-                    robot_id, **robot_config
-                )
-                self.robot_sessions[robot_id].connect()
-            return self.robot_sessions[robot_id]
-        finally:
-            self.getting_session_mutex.release()
+        with self.getting_session_mutex:
+            # Another thread may have created the session while waiting for the
+            # mutex. Only create connection and register callbacks for new robot
+            # sessions.
+            if self.has_robot(robot_id):
+                return self.robot_sessions[robot_id]
+            # Get the config params for this robot_id
+            robot_config = self.robot_config.get(robot_id, {})
+            # If there is no robot name in the config yaml, use the one
+            # provided to this method.
+            if not robot_config.get("robot_name"):
+                robot_config["robot_name"] = robot_name
+            robot_session = self.robot_session_factory.build(robot_id, **robot_config)
+            robot_session.connect()
+            self.robot_sessions[robot_id] = robot_session
+            return robot_session
 
     def tear_down(self):
-        """Destroys all RobotSession in this pool"""
-        for rs in self.robot_sessions.values():
-            rs.disconnect()
-        self.robot_sessions = {}
+        """Destroys all RobotSession in this pool and closes the HTTP session
+        shared by them"""
+        try:
+            for rs in self.robot_sessions.values():
+                rs.disconnect()
+        finally:
+            self.robot_sessions = {}
+            self.robot_session_factory.http_session.close()
 
     def has_robot(self, robot_id):
         """Checks if a RobotSession for a specific robot exists in this pool"""
@@ -1490,7 +1536,7 @@ class RobotSessionPool:
         """Destroys a RobotSession in this pool"""
         if not self.has_robot(robot_id):
             return
-        sess = self.get_session(robot_id)
+        sess = self.robot_sessions[robot_id]
         sess.disconnect()
         del self.robot_sessions[robot_id]
 
@@ -16,18 +16,21 @@ Docs: https://docs.pytest.org/en/latest/example/simple.html
       https://docs.pytest.org/en/latest/plugins.html#requiring-loading-plugins-in-a-test-module-or-conftest-file
 """
 
+import time
+from types import SimpleNamespace
+
 import pytest
 import paho.mqtt.client as mqtt
 from paho.mqtt.client import MQTTMessageInfo
 import requests_mock
 
-from inorbit_edge.robot import INORBIT_CLOUD_SDK_ROBOT_CONFIG_URL
+from inorbit_edge.robot import RobotSession, INORBIT_CLOUD_SDK_ROBOT_CONFIG_URL
 
 
 @pytest.fixture
 def mock_mqtt_client(mocker):
     fake_mid = 52
-    mock = mocker.patch.object(mqtt, "Client")
+    mock = mocker.patch.object(mqtt, "Client", spec=True)
     mock_mqtt_client = mock.return_value
 
     # Patch MQTTMessageInfo method wait_for_publish
@@ -35,15 +38,53 @@ def mock_mqtt_client(mocker):
     mock_wait_for_publish.return_value = True
 
     mqtt_message_info = MQTTMessageInfo(fake_mid)
-    mock_mqtt_client.subscribe = mocker.MagicMock(return_value=mqtt_message_info)
-    mock_mqtt_client.unsubscribe = mocker.MagicMock(return_value=mqtt_message_info)
-    mock_mqtt_client.publish = mocker.MagicMock(return_value=mqtt_message_info)
+    mock_mqtt_client.subscribe.return_value = mqtt_message_info
+    mock_mqtt_client.unsubscribe.return_value = mqtt_message_info
+    mock_mqtt_client.publish.return_value = mqtt_message_info
     mock_mqtt_client.connect.return_value = 0
     mock_mqtt_client.reconnect.return_value = 0
     mock_mqtt_client.disconnect.return_value = 0
     return mock_mqtt_client
 
 
+@pytest.fixture
+def fake_clock(monkeypatch):
+    # Virtual clock for ``inorbit_edge.robot``: ``time.time()`` returns the virtual
+    # time and ``time.sleep()`` advances it instantly instead of blocking.
+    clock = SimpleNamespace(now=1000.0)
+
+    def sleep(seconds):
+        clock.now += seconds
+
+    # Keep the rest of the ``time`` module available to the code under test
+    fake_time = SimpleNamespace(
+        **{**vars(time), "time": lambda: clock.now, "sleep": sleep}
+    )
+    monkeypatch.setattr("inorbit_edge.robot.time", fake_time)
+    return clock
+
+
+@pytest.fixture
+def robot_session(mock_mqtt_client, fake_clock):
+    # Robot session using the mocked MQTT client. Not connected, so tests can
+    # register callbacks or mock methods before connecting it.
+    return RobotSession(
+        robot_id="id_123",
+        robot_name="name_123",
+        api_key="apikey_123",
+    )
+
+
+@pytest.fixture
+def connected_robot_session(robot_session, mock_inorbit_api):
+    # Robot session connected with the mocked InOrbit API response data. The
+    # ``on_connect`` callback is executed manually, so the session subscribes to
+    # its topics and registers its built-in callbacks.
+    robot_session.connect()
+    robot_session._on_connect(..., ..., ..., 0)
+    return robot_session
+
+
 @pytest.fixture
 def mock_popen(mocker):
     return mocker.patch("subprocess.Popen")
@@ -2,12 +2,13 @@
 # -*- coding: utf-8 -*-
 
 import logging
-from time import sleep
-from random import randint, uniform, random
-from math import pi
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, sleep
 import os
 import sys
-from math import inf
+
+import numpy as np
 
 from inorbit_edge.robot import (
     RobotSessionFactory,
@@ -23,9 +24,16 @@ logging.basicConfig(
     handlers=[logging.StreamHandler()],
 )
 
+# Seed for the simulation random data. Set it to an integer to get reproducible
+# data between runs.
+SEED = None
+seed_sequence = np.random.SeedSequence(SEED)
+# Random number generator used by the main thread
+rng = np.random.default_rng(seed_sequence)
+
 MAX_X = 20
 MAX_Y = 20
-MAX_YAW = 2 * pi
+MAX_YAW = 2 * np.pi
 
 LIDAR_RANGES = 700
 LIDAR_MIN = 2.0
@@ -34,6 +42,9 @@ LIDAR_MAX = 3.2
 NUM_ROBOTS = 2
 NUM_LASERS = 3
 
+# Offsets of the published path points relative to the robot position
+PATH_OFFSETS = np.array([[0.0, 0.0], [10.0, 10.0], [20.0, 10.0]])
+
 ROBOT_FOOTPRINT = RobotFootprintSpec(
     footprint=[
         {"x": -0.5, "y": -0.5},
@@ -46,62 +57,125 @@ ROBOT_FOOTPRINT = RobotFootprintSpec(
 )
 
 
-class FakeRobot:
-    """Class that simulates robot data and generates random data"""
+# Snapshot of the data of a single fake robot, as consumed by the publish loop
+FakeRobot = namedtuple(
+    "FakeRobot",
+    [
+        "robot_id",
+        "x",
+        "y",
+        "yaw",
+        "cpu",
+        "battery",
+        "status",
+        "linear_distance",
+        "angular_distance",
+        "linear_speed",
+        "angular_speed",
+    ],
+)
+
+
+class FakeRobotFleet:
+    """Class that simulates data for a fleet of robots and generates random data.
+
+    Robot data is stored as one array per field, indexed by robot, so the whole
+    fleet is updated with a handful of vectorized operations on every tick.
+    """
+
+    __slots__ = (
+        "robot_ids",
+        "x",
+        "y",
+        "yaw",
+        "frame_id",
+        "cpu",
+        "battery",
+        "status",
+        "linear_distance",
+        "angular_distance",
+        "linear_speed",
+        "angular_speed",
+    )
 
-    def __init__(self, robot_id, robot_name) -> None:
-        self.logger = logging.getLogger(__class__.__name__)
-        self.robot_id = robot_id
-        self.robot_name = robot_name
+    def __init__(self, robot_ids) -> None:
+        self.robot_ids = list(robot_ids)
+        n = len(self.robot_ids)
 
         # Set initial x, y position and yaw
-        self.x = uniform(-MAX_X / 4, MAX_X / 4)
-        self.y = uniform(-MAX_Y / 4, MAX_Y / 4)
-        self.yaw = uniform(0, MAX_YAW / 2)
+        self.x = rng.uniform(-MAX_X / 4, MAX_X / 4, n)
+        self.y = rng.uniform(-MAX_Y / 4, MAX_Y / 4, n)
+        self.yaw = rng.uniform(0, MAX_YAW / 2, n)
         self.frame_id = "map"
 
         # Initialize other robot data
-        self.cpu = 0
-        self.battery = 0
-        self.status = "Idle"
+        self.cpu = np.zeros(n)
+        self.battery = np.zeros(n, dtype=int)
+        self.status = np.full(n, "Idle")
 
         # Initialize odometry data
-        self.linear_distance = 0
-        self.angular_distance = 0
-        self.linear_speed = 0
-        self.angular_speed = 0
+        self.linear_distance = np.zeros(n)
+        self.angular_distance = np.zeros(n)
+        self.linear_speed = np.zeros(n)
+        self.angular_speed = np.zeros(n)
 
     def move(self):
-        """Modifies robot data using values generated randomly"""
-
-        # Generate random deltas for x, y and yaw
-        x_delta = uniform(-2, 2)
-        y_delta = uniform(-2, 2)
-        yaw_delta = uniform(-pi / 2, pi / 2)
-
-        # Ignore position update if the new coordinate exceeds x limits
-        if MAX_X > self.x + x_delta > 0:
-            self.x = self.x + x_delta
-
-        # Ignore position update if the new coordinate exceeds y limits
-        if MAX_Y > self.y + y_delta > 0:
-            self.y = self.y + y_delta
-
-        # Ignore orientation update if the new yaw exceeds yaw limits
-        if MAX_YAW > self.yaw + yaw_delta > 0:
-            self.yaw = self.yaw + yaw_delta
-
-        self.linear_distance = random() * 10
-        self.angular_distance = random() * 2
-        self.linear_speed = uniform(-1, 1)
-        self.angular_speed = uniform(-pi / 4, pi / 4)
-
-        # Generate a random integer value for battery
-        self.battery = randint(0, 100)
+        """Modifies the data of every robot using values generated randomly"""
+        # Draw every random value of the tick at once, one row per robot field.
+        # Rows are uniform in [0, 1) and scaled below to the range of each field.
+        (
+            x_delta,
+            y_delta,
+            yaw_delta,
+            linear_distance,
+            angular_distance,
+            linear_speed,
+            angular_speed,
+            battery,
+            status,
+            cpu,
+        ) = rng.random((10, len(self.robot_ids)))
+
+        # Apply random deltas to x, y and yaw
+        self.x += x_delta * 4 - 2
+        self.y += y_delta * 4 - 2
+        self.yaw += (yaw_delta - 0.5) * np.pi
+
+        # Clamp position and orientation to their limits
+        np.clip(self.x, 0, MAX_X, out=self.x)
+        np.clip(self.y, 0, MAX_Y, out=self.y)
+        np.clip(self.yaw, 0, MAX_YAW, out=self.yaw)
+
+        self.linear_distance = linear_distance * 10
+        self.angular_distance = angular_distance * 2
+        self.linear_speed = linear_speed * 2 - 1
+        self.angular_speed = (angular_speed - 0.5) * np.pi / 2
+
+        # Generate random integer values for battery
+        self.battery = (battery * 101).astype(int)
         # Generate random status
-        self.status = "Mission" if random() > 0.5 else "Idle"
-        # Generate a random float value for cpu usage
-        self.cpu = random() * 100
+        self.status = np.where(status > 0.5, "Mission", "Idle")
+        # Generate random float values for cpu usage
+        self.cpu = cpu * 100
+
+    def robots(self):
+        """Returns the current data of every robot, converted to Python scalars"""
+        columns = (
+            self.x,
+            self.y,
+            self.yaw,
+            self.cpu,
+            self.battery,
+            self.status,
+            self.linear_distance,
+            self.angular_distance,
+            self.linear_speed,
+            self.angular_speed,
+        )
+        return [
+            FakeRobot(robot_id, *values)
+            for robot_id, *values in zip(self.robot_ids, *(c.tolist() for c in columns))
+        ]
 
 
 def log_command(robot_id, command_name, args, options):
@@ -145,6 +219,63 @@ def my_command_handler(robot_id, command_name, args, options):
         options["result_function"]("0")
 
 
+def publish_robot_data(robot_session, robot_rng, ranges, fake_robot, frame_id):
+    """Publishes the data of a fake robot using its robot session.
+
+    Args:
+        robot_session (RobotSession): Session of the robot
+        robot_rng (numpy.random.Generator): Random number generator of the robot.
+            Generators aren't shared between robots as their data is published
+            from different threads.
+        ranges (numpy.ndarray): Buffer of shape (NUM_LASERS, LIDAR_RANGES) where
+            the lidar ranges of the robot are generated
+        fake_robot (FakeRobot): Data of the robot to publish
+        frame_id (str): Robot map frame identifier
+    """
+
+    robot_session.publish_pose(
+        x=fake_robot.x,
+        y=fake_robot.y,
+        yaw=fake_robot.yaw,
+        frame_id=frame_id,
+    )
+    robot_session.publish_system_stats(cpu_load_percentage=robot_rng.random())
+    # Send all key-values in a single message
+    robot_session.publish_key_values(
+        {
+            "battery": fake_robot.battery,
+            "status": fake_robot.status,
+            "foo": "bar",
+        }
+    )
+    robot_session.publish_odometry(
+        linear_distance=fake_robot.linear_distance,
+        angular_distance=fake_robot.angular_distance,
+        linear_speed=fake_robot.linear_speed,
+        angular_speed=fake_robot.angular_speed,
+    )
+
+    robot_session.publish_path(
+        path_points=(PATH_OFFSETS + (fake_robot.x, fake_robot.y)).tolist()
+    )
+
+    # Publish multiple lasers. Generate random lidar ranges within arbitrary
+    # limits for all lasers at once, one row per laser, reusing the buffer.
+    robot_rng.random(out=ranges)
+    ranges *= LIDAR_MAX
+    np.maximum(ranges, LIDAR_MIN, out=ranges)
+    # Make ranges over threshold infinite
+    ranges[ranges >= 3] = np.inf
+    # NOTE: for publishing laser scans the robot pose is needed.
+    # In that case, avoid using publish_pose method.
+    robot_session.publish_lasers(
+        x=fake_robot.x,
+        y=fake_robot.y,
+        yaw=fake_robot.yaw,
+        ranges=ranges.tolist(),
+    )
+
+
 if __name__ == "__main__":
     inorbit_api_endpoint = os.environ.get("INORBIT_URL")
     inorbit_api_url = os.environ.get("INORBIT_API_URL")
@@ -179,101 +310,87 @@ if __name__ == "__main__":
     robot_session_factory.register_commands_path("./user_scripts", r".*\.sh")
 
     robot_session_pool = RobotSessionPool(robot_session_factory, inorbit_robots_config)
-    # Dictionary mapping robot ID and fake robot object
-    fake_robot_pool = dict()
+    # Fake fleet simulating the data of every robot
+    robot_ids = [f"edgesdk_py_{i}" for i in range(NUM_ROBOTS)]
+    fake_robot_fleet = FakeRobotFleet(robot_ids)
+    # Independent random number generators for publishing the data of each robot
+    robot_rngs = [np.random.default_rng(s) for s in seed_sequence.spawn(NUM_ROBOTS)]
+    # Lidar ranges buffers of each robot, reused on every tick
+    robot_ranges = [np.empty((NUM_LASERS, LIDAR_RANGES)) for _ in robot_ids]
+
+    # Lasers configuration, shared by every robot as it isn't modified when
+    # registering the lasers
+    laser_configs = [
+        LaserConfig(
+            j * rng.random(),
+            j * rng.random(),
+            np.pi * j * rng.random(),
+            (-np.pi / (j + 1), np.pi / (j + 1)),
+            (LIDAR_MIN, LIDAR_MAX),
+            LIDAR_RANGES,
+        )
+        for j in range(NUM_LASERS)
+    ]
+
+    # Map shared by every robot. The SDK reads and encodes the file only once
+    # for all the robot sessions publishing it.
+    map_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "map.png")
 
-    # Create fake robots and populate `fake_robot_pool` dictionary
-    for i in range(NUM_ROBOTS):
-        cur_robot_id = "edgesdk_py_{}".format(i)
+    # Create a robot session for every fake robot. Sessions are kept in the same
+    # order as the fleet robots so the publish loop doesn't need to look them up
+    robot_sessions = []
+    for cur_robot_id in robot_ids:
         robot_session = robot_session_pool.get_session(
             robot_id=cur_robot_id, robot_name=cur_robot_id
         )
-        fake_robot_pool[cur_robot_id] = FakeRobot(
-            robot_id=cur_robot_id, robot_name=cur_robot_id
-        )
-        img = os.path.join(os.path.dirname(os.path.abspath(__file__)), "map.png")
-        robot_session.publish_map(img, "map", "map", -1.5, -1.5, 0.05)
+        robot_sessions.append(robot_session)
+        robot_session.publish_map(map_file, "map", "map", -1.5, -1.5, 0.05)
         if video_url is not None:
             robot_session.register_camera("0", OpenCVCamera(video_url))
 
         # Configure lasers
-        configs = []
-        for j in range(NUM_LASERS):
-            configs.append(
-                LaserConfig(
-                    j * random(),
-                    j * random(),
-                    pi * j * random(),
-                    (-pi / (j + 1), pi / (j + 1)),
-                    (LIDAR_MIN, LIDAR_MAX),
-                    LIDAR_RANGES,
-                )
-            )
-        robot_session.register_lasers(configs)
+        robot_session.register_lasers(laser_configs)
 
         # Configure robot footprint
         if ROBOT_FOOTPRINT:
             robot_session.apply_footprint(ROBOT_FOOTPRINT)
 
-    # Go through every fake robot and simulate robot movement
+    # Publish the data of every robot concurrently, as each publish call is I/O.
+    # Each task publishes a whole robot, so more workers than robots are useless.
+    executor = ThreadPoolExecutor(max_workers=min(32, NUM_ROBOTS))
+
+    # Go through every fake robot and simulate robot movement. Ticks are scheduled
+    # against a monotonic deadline so publishing time doesn't add up as drift.
+    next_tick = monotonic() + 1.0
     while True:
         try:
-            for cur_robot_id, fake_robot in fake_robot_pool.items():
-                fake_robot.move()
-
-                # Get the corresponding robot session and publish robot data
-                robot_session = robot_session_pool.get_session(robot_id=cur_robot_id)
-                robot_session.publish_pose(
-                    x=fake_robot.x,
-                    y=fake_robot.y,
-                    yaw=fake_robot.yaw,
-                    frame_id=fake_robot.frame_id,
-                )
-                robot_session.publish_system_stats(cpu_load_percentage=random())
-                robot_session.publish_key_values(
-                    {
-                        "battery": fake_robot.battery,
-                        "status": fake_robot.status,
-                    }
-                )
-                robot_session.publish_key_values(
-                    {
-                        "foo": "bar",
-                    }
+            fake_robot_fleet.move()
+            futures = [
+                executor.submit(
+                    publish_robot_data,
+                    robot_session,
+                    robot_rng,
+                    ranges,
+                    fake_robot,
+                    fake_robot_fleet.frame_id,
                 )
-                robot_session.publish_odometry(
-                    linear_distance=fake_robot.linear_distance,
-                    angular_distance=fake_robot.angular_distance,
-                    linear_speed=fake_robot.linear_speed,
-                    angular_speed=fake_robot.angular_speed,
+                for robot_session, robot_rng, ranges, fake_robot in zip(
+                    robot_sessions,
+                    robot_rngs,
+                    robot_ranges,
+                    fake_robot_fleet.robots(),
                 )
-
-                robot_session.publish_path(
-                    path_points=[
-                        (fake_robot.x, fake_robot.y),
-                        (fake_robot.x + 10, fake_robot.y + 10),
-                        (fake_robot.x + 20, fake_robot.y + 10),
-                    ]
-                )
-
-                # Publish multiple lasers
-                ranges, angles = [], []
-                for i in range(NUM_LASERS):
-                    # Generate random lidar ranges within arbitrary limits
-                    lidar = [max(LIDAR_MIN, random() * LIDAR_MAX) for _ in range(700)]
-                    # Make ranges over threshold infinite
-                    lidar = [inf if r >= 3 else r for r in lidar]
-                    ranges.append(lidar)
-                # NOTE: for publishing laser scans the robot pose is needed.
-                # In that case, avoid using publish_pose method.
-                robot_session.publish_lasers(
-                    x=fake_robot.x,
-                    y=fake_robot.y,
-                    yaw=fake_robot.yaw,
-                    ranges=ranges,
-                )
-
-            sleep(1)
+            ]
+            # Wait for every robot, re-raising any error from the worker threads
+            for future in futures:
+                future.result()
+
+            now = monotonic()
+            if next_tick > now:
+                sleep(next_tick - now)
+            # If the tick overran, start counting from now instead of catching up
+            next_tick = max(next_tick + 1.0, now)
         except KeyboardInterrupt:
+            executor.shutdown()
             robot_session_pool.tear_down()
             sys.exit()
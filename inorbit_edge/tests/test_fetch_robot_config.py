@@ -12,82 +12,50 @@ Docs: https://docs.pytest.org/en/latest/
       https://docs.pytest.org/en/latest/goodpractices.html#conventions-for-python-test-discovery
 """
 
-from inorbit_edge.robot import RobotSession
-from inorbit_edge.robot import INORBIT_CLOUD_SDK_ROBOT_CONFIG_URL
-import requests_mock
+from inorbit_edge.robot import RobotSession, INORBIT_CLOUD_SDK_ROBOT_CONFIG_URL
 import pytest
 
-# Dummy cloud_sdk_robot_config sample response for testing
-ROBOT_CONFIG_MOCK_RESPONSE = {
-    "hostname": "localdev.com",
-    "port": 1883,
-    "protocol": "mqtt://",
-    "websocket_port": 9001,
-    "websocket_protocol": "ws://",
-    "username": "test",
-    "password": "mytest123",
-    "robotApiKey": "robot_apikey_123",
-    "awsUploadCredentials": {
-        "secretKey": "secret_key",
-        "accessKey": "access_key",
-        "company": "fakecompany",
-        "bucket": "inorbit-data-other",
-    },
-}
 
-
-# path where the robot session can fetch the robot config properly
-def test_get_robot_config_from_session():
-    # test required parameters only
-    robot_session = RobotSession(
-        robot_id="id_123", robot_name="name_123", api_key="apikey_123"
-    )
-
-    # TODO: duplicate code segment with line 72
-    with requests_mock.Mocker() as mock:
-        mock.post(INORBIT_CLOUD_SDK_ROBOT_CONFIG_URL, json=ROBOT_CONFIG_MOCK_RESPONSE)
-        _test_fetch_robot_config_helper(robot_session._fetch_robot_config())
-
-    # test with robot_key instead of api_key
+# path where the robot session can fetch the robot config properly. The robot
+# config response is provided by the `mock_inorbit_api` fixture.
+@pytest.mark.parametrize(
+    "credentials",
+    [
+        # test required parameters only
+        {"api_key": "apikey_123"},
+        # test with robot_key instead of api_key
+        {"robot_key": "robotkey_123"},
+    ],
+)
+def test_get_robot_config_from_session(mock_inorbit_api, credentials):
     robot_session = RobotSession(
-        robot_id="id_123", robot_name="name_123", robot_key="robotkey_123"
+        robot_id="id_123", robot_name="name_123", **credentials
     )
-
-    with requests_mock.Mocker() as mock:
-        mock.post(INORBIT_CLOUD_SDK_ROBOT_CONFIG_URL, json=ROBOT_CONFIG_MOCK_RESPONSE)
-        _test_fetch_robot_config_helper(robot_session._fetch_robot_config())
+    _test_fetch_robot_config_helper(robot_session._fetch_robot_config())
 
 
 def _test_fetch_robot_config_helper(robot_config):
-    with requests_mock.Mocker() as mock:
-        mock.post(INORBIT_CLOUD_SDK_ROBOT_CONFIG_URL, json=ROBOT_CONFIG_MOCK_RESPONSE)
-
-        assert robot_config is not None
+    assert robot_config is not None
 
-        assert all(
-            [
-                robot_config["hostname"] == "localdev.com",
-                robot_config["port"] == 1883,
-                robot_config["protocol"] == "mqtt://",
-                robot_config["websocket_port"] == 9001,
-                robot_config["websocket_protocol"] == "ws://",
-                robot_config["username"] == "test",
-                robot_config["password"] == "mytest123",
-                robot_config["robotApiKey"] == "robot_apikey_123",
-                robot_config["awsUploadCredentials"] is not None,
-            ]
-        )
+    assert robot_config["hostname"] == "localdev.com"
+    assert robot_config["port"] == 1883
+    assert robot_config["protocol"] == "mqtt://"
+    assert robot_config["websocket_port"] == 9001
+    assert robot_config["websocket_protocol"] == "ws://"
+    assert robot_config["username"] == "test"
+    assert robot_config["password"] == "mytest123"
+    assert robot_config["robotApiKey"] == "robot_apikey_123"
+    assert robot_config["awsUploadCredentials"] is not None
 
 
 # path where the robot session cannot fetch the robot config properly
-def test_bad_request_error():
+def test_bad_request_error(requests_mock):
+    requests_mock.post(INORBIT_CLOUD_SDK_ROBOT_CONFIG_URL, status_code=500)
+
     # test required parameters only
     robot_session = RobotSession(
         robot_id="id_123", robot_name="name_123", api_key="appkey_123"
     )
 
-    with requests_mock.Mocker() as mock:
-        mock.post(INORBIT_CLOUD_SDK_ROBOT_CONFIG_URL, status_code=500)
-
-        with pytest.raises(Exception):
-            robot_session._fetch_robot_config()
+    with pytest.raises(Exception):
+        robot_session._fetch_robot_config()
@@ -3,31 +3,19 @@
 # TODO(mike) add tests for wait event step
 # TODO(mike) add tests cancel()
 
+import threading
+from types import SimpleNamespace
+
+from inorbit_edge.missions import MissionStepNavigateTo
 from inorbit_edge.robot import (
-    RobotSession,
     COMMAND_MESSAGE,
     COMMAND_CUSTOM_COMMAND,
     COMMAND_NAV_GOAL,
 )
 
 
-def test_mission_end_to_end(
-    mock_mqtt_client, mock_inorbit_api, mocker, mock_sleep, mock_time
-):
-    """Tests mission execution and tracking"""
-    robot_session = RobotSession(
-        robot_id="id_123", robot_name="name_123", api_key="apikey_123"
-    )
-
-    # Mock command handler.
-    my_command_handler = mocker.MagicMock()
-    # Set command handler mock method's name as it's accessed by the RobotSession class
-    my_command_handler.configure_mock(**{"__name__": "my_command_handler"})
-    robot_session.publish_key_values = mocker.MagicMock()
-    robot_session.register_command_callback(my_command_handler)
-    # Set this pose so the goto waypoint step succeeds
-    robot_session.publish_pose(10, 15.5, 0.5, "map")
-    message = """inorbit_run_mission 1234
+# Mission used by the end to end test
+MISSION_MESSAGE = """inorbit_run_mission 1234
     {
       "label": "Delivery Mission",
       "steps": [
@@ -58,7 +46,7 @@ def test_mission_end_to_end(
         {
           "type": "WaitSeconds",
           "label": "sleep",
-          "seconds": 1.32
+          "seconds": 0.01
         },
         {
           "type": "Action",
@@ -81,15 +69,38 @@ def test_mission_end_to_end(
       ]
     }
     """
+
+# Tasks reported by the mission tracking of the mission above
+EXPECTED_TASKS = [
+    {"label": "init data", "taskId": "0"},
+    {"label": "my step", "taskId": "1"},
+    {"label": "my step 2", "taskId": "2"},
+    {"label": "sleep", "taskId": "3"},
+    {"label": "go to picking station", "taskId": "4"},
+    {"label": "run a script", "taskId": "5"},
+]
+
+
+def test_mission_end_to_end(
+    robot_session, mock_inorbit_api, mocker, mock_sleep, mock_time
+):
+    """Tests mission execution and tracking"""
+
+    # Mock command handler. Its name is accessed by the RobotSession class
+    my_command_handler = mocker.Mock(__name__="my_command_handler")
+    robot_session.publish_key_values = mocker.Mock()
+    robot_session.register_command_callback(my_command_handler)
+    # Set this pose so the goto waypoint step succeeds
+    robot_session.publish_pose(10, 15.5, 0.5, "map")
     # run mission
-    robot_session.dispatch_command(COMMAND_MESSAGE, [message])
+    robot_session.dispatch_command(COMMAND_MESSAGE, [MISSION_MESSAGE])
     # wait for mission completion
     assert robot_session.missions_module.executor.wait_until_idle(10)
     # filter out the execute mission command
     dispatched_commands = [
         c
         for c in my_command_handler.call_args_list
-        if c[0][0] != COMMAND_MESSAGE or c[0][1][0] != message
+        if c[0][0] != COMMAND_MESSAGE or c[0][1][0] != MISSION_MESSAGE
     ]
     # check step completed and message published
     call_args, _ = dispatched_commands[0]
@@ -118,14 +129,6 @@ def test_mission_end_to_end(
         for c in robot_session.publish_key_values.call_args_list
         if "key_values" in c[1] and "mission_tracking" in c[1]["key_values"]
     ]
-    expected_tasks = [
-        {"label": "init data", "taskId": "0"},
-        {"label": "my step", "taskId": "1"},
-        {"label": "my step 2", "taskId": "2"},
-        {"label": "sleep", "taskId": "3"},
-        {"label": "go to picking station", "taskId": "4"},
-        {"label": "run a script", "taskId": "5"},
-    ]
     expected_reports = [
         {
             "missionId": "1234\n",
@@ -137,7 +140,7 @@ def test_mission_end_to_end(
             "data": {"order": "#321", "items": ["InOrbito", "Bottle"]},
             "status": "OK",
             "completedPercent": 0.0,
-            "tasks": expected_tasks,
+            "tasks": EXPECTED_TASKS,
         },
         {
             "missionId": "1234\n",
@@ -149,7 +152,7 @@ def test_mission_end_to_end(
             "data": {"order": "#321", "items": ["InOrbito", "Bottle"]},
             "status": "OK",
             "completedPercent": 0.16666666666666666,
-            "tasks": expected_tasks,
+            "tasks": EXPECTED_TASKS,
         },
         {
             "missionId": "1234\n",
@@ -161,7 +164,7 @@ def test_mission_end_to_end(
             "data": {"order": "#321", "items": ["InOrbito", "Bottle"]},
             "status": "OK",
             "completedPercent": 0.3333333333333333,
-            "tasks": expected_tasks,
+            "tasks": EXPECTED_TASKS,
         },
         {
             "missionId": "1234\n",
@@ -173,7 +176,7 @@ def test_mission_end_to_end(
             "data": {"order": "#321", "items": ["InOrbito", "Bottle"]},
             "status": "OK",
             "completedPercent": 0.5,
-            "tasks": expected_tasks,
+            "tasks": EXPECTED_TASKS,
         },
         {
             "missionId": "1234\n",
@@ -185,7 +188,7 @@ def test_mission_end_to_end(
             "data": {"order": "#321", "items": ["InOrbito", "Bottle"]},
             "status": "OK",
             "completedPercent": 0.6666666666666666,
-            "tasks": expected_tasks,
+            "tasks": EXPECTED_TASKS,
         },
         {
             "missionId": "1234\n",
@@ -197,7 +200,7 @@ def test_mission_end_to_end(
             "data": {"order": "#321", "items": ["InOrbito", "Bottle"]},
             "status": "OK",
             "completedPercent": 0.8333333333333334,
-            "tasks": expected_tasks,
+            "tasks": EXPECTED_TASKS,
         },
         {
             "missionId": "1234\n",
@@ -209,7 +212,44 @@ def test_mission_end_to_end(
             "data": {"order": "#321", "items": ["InOrbito", "Bottle"]},
             "status": "OK",
             "completedPercent": 1.0,
-            "tasks": expected_tasks,
+            "tasks": EXPECTED_TASKS,
         },
     ]
-    assert reports == expected_reports
+    assert len(reports) == len(expected_reports)
+    # compare reports one by one so a failure points to the mismatching report
+    for report, expected_report in zip(reports, expected_reports):
+        assert report == expected_report
+
+
+def test_navigate_to_step_cancel(robot_session, mocker):
+    """Tests canceling a NavigateTo step whose waypoint is never reached"""
+
+    robot_session.register_command_callback(mocker.Mock(__name__="handler"))
+    step = MissionStepNavigateTo(
+        "go to picking station",
+        {"x": 10, "y": 15.5, "theta": 0.5, "frameId": "map"},
+        {"positionMeters": 0.05, "angularRadians": 0.25},
+        None,
+    )
+    mission = SimpleNamespace(robot_session=robot_session)
+
+    # The waypoint is never reached. Flag the pose check, so the step is
+    # canceled while it waits between checks rather than before it starts.
+    checking_pose = threading.Event()
+
+    def reached_waypoint(*_):
+        checking_pose.set()
+        return False
+
+    mocker.patch.object(robot_session, "reached_waypoint", reached_waypoint)
+
+    execution = threading.Thread(target=step.execute, args=(mission,))
+    execution.start()
+    assert checking_pose.wait(timeout=1)
+    step.cancel()
+    # Well under the 1 second between pose checks
+    execution.join(timeout=0.2)
+
+    assert not execution.is_alive()
+    assert step.canceled
+    assert not step.success()
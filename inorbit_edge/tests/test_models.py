@@ -4,11 +4,7 @@
 # Copyright 2024 InOrbit, Inc.
 
 # Standard
-import importlib
-import os
 import re
-import sys
-from unittest import mock
 
 # Third-party
 import pytest
@@ -20,6 +16,9 @@ from inorbit_edge.robot import INORBIT_CLOUD_SDK_ROBOT_CONFIG_URL
 
 
 class TestCameraConfig:
+    _QUALITY_RE = re.compile("Must be between 1 and 100")
+    _POSITIVE_RE = re.compile("Must be positive and non-zero")
+
     def test_quality_validation(self):
         # Test with valid quality parameter
         camera1 = CameraConfig(video_url="https://test.com/", quality=50)
@@ -30,10 +29,10 @@ class TestCameraConfig:
         assert camera2.quality is None
 
         # Test outside range quality parameter
-        with pytest.raises(ValueError, match="Must be between 1 and 100"):
+        with pytest.raises(ValueError, match=self._QUALITY_RE):
             CameraConfig(video_url="https://test.com/", quality=-10)
 
-        with pytest.raises(ValueError, match="Must be between 1 and 100"):
+        with pytest.raises(ValueError, match=self._QUALITY_RE):
             CameraConfig(video_url="https://test.com/", quality=150)
 
     def test_rate_validation(self):
@@ -46,7 +45,7 @@ class TestCameraConfig:
         assert camera2.rate is None
 
         # Test with non-positive rate parameter
-        with pytest.raises(ValueError, match="Must be positive and non-zero"):
+        with pytest.raises(ValueError, match=self._POSITIVE_RE):
             CameraConfig(video_url="https://test.com/", rate=0)
 
     def test_scaling_validation(self):
@@ -59,7 +58,7 @@ class TestCameraConfig:
         assert camera4.scaling is None
 
         # Test with negative scaling parameter
-        with pytest.raises(ValueError, match="Must be positive and non-zero"):
+        with pytest.raises(ValueError, match=self._POSITIVE_RE):
             CameraConfig(video_url="https://test.com/", scaling=-1.5)
 
     def test_video_url_validation(self):
@@ -130,12 +129,8 @@ class TestRobotSessionModel:
         with pytest.raises(ValidationError, match=r"Whitespaces are not allowed"):
             RobotSessionModel(**base_model)
 
-    @mock.patch.dict(os.environ, {"INORBIT_API_KEY": "env_valid_key"})
-    def test_reads_api_key_from_environment_variable(self, base_model):
-        # Re-import after Mock
-        importlib.reload(sys.modules["inorbit_edge.models"])
-        from inorbit_edge.models import RobotSessionModel
-
+    def test_reads_api_key_from_environment_variable(self, monkeypatch):
+        monkeypatch.setenv("INORBIT_API_KEY", "env_valid_key")
         init_input = {
             "robot_id": "123",
             "robot_name": "test_robot",
@@ -144,12 +139,8 @@ class TestRobotSessionModel:
         model = RobotSessionModel(**init_input)
         assert model.api_key == "env_valid_key"
 
-    @mock.patch.dict(os.environ, {"INORBIT_USE_SSL": "false"})
-    def test_reads_use_ssl_from_environment_variable(self, base_model):
-        # Re-import after Mock
-        importlib.reload(sys.modules["inorbit_edge.models"])
-        from inorbit_edge.models import RobotSessionModel
-
+    def test_reads_use_ssl_from_environment_variable(self, monkeypatch):
+        monkeypatch.setenv("INORBIT_USE_SSL", "false")
         init_input = {
             "robot_id": "123",
             "robot_name": "test_robot",
@@ -2,76 +2,59 @@
 # -*- coding: utf-8 -*-
 
 import os
-from unittest.mock import MagicMock
+import shutil
 import pytest
-from requests import HTTPError
+from requests import HTTPError, Session
 
 from inorbit_edge.robot import RobotSession, RobotFootprintSpec, RobotMap
+from inorbit_edge.robot import ROBOT_PATH_POINTS_LIMIT
 from inorbit_edge.robot import INORBIT_CLOUD_SDK_ROBOT_CONFIG_URL, INORBIT_REST_API_URL
 from inorbit_edge import get_module_version
-from inorbit_edge.inorbit_pb2 import MapMessage
-
-
-def test_robot_session_init(monkeypatch):
-    # test required parameters only (using api_key)
-    robot_session = RobotSession(
-        robot_id="id_123", robot_name="name_123", api_key="apikey_123"
-    )
-
-    assert all(
-        [
-            robot_session.robot_id == "id_123",
-            robot_session.robot_name == "name_123",
-            robot_session.api_key == "apikey_123",
-            robot_session.agent_version.endswith("edgesdk_py"),
-            robot_session.endpoint == INORBIT_CLOUD_SDK_ROBOT_CONFIG_URL,
-            robot_session.use_ssl,
-            not robot_session.use_websockets,
-            robot_session.client._transport == "tcp",
-            robot_session.http_proxy is None,
-        ]
-    )
-
-    # test proxy environment variable
-    # noinspection PyArgumentList
-    with monkeypatch.context() as m:
-        m.setenv("HTTP_PROXY", "https://foo_bar.com:1234")
-        robot_session = RobotSession(
-            robot_id="id_123", robot_name="name_123", api_key="apikey_123"
-        )
-
-        assert all(
-            [
-                robot_session.use_websockets,
-                robot_session.client._transport == "websockets",
-                robot_session.http_proxy == "https://foo_bar.com:1234",
-            ]
-        )
-
-    # test with robot_key instead of api_key
+from inorbit_edge.inorbit_pb2 import MapMessage, PathDataMessage
+
+# Robot state messages published on connection and disconnection
+ONLINE_STATE = f"1|robot_apikey_123|{get_module_version()}.edgesdk_py|name_123"
+OFFLINE_STATE = f"0|robot_apikey_123|{get_module_version()}.edgesdk_py|name_123"
+
+MAP_FILE = f"{os.path.dirname(__file__)}/utils/test_map.png"
+# Hash and PNG bytes of MAP_FILE as returned by RobotMap.get_image_data()
+EXPECTED_HASH = 4565286020005755223
+EXPECTED_PIXELS = b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x04\x00\x00\x00\x04\x08\x02\x00\x00\x00&\x93\t)\x00\x00\x01\x84iCCPICC Profile\x00\x00x\x9c}\x91=H\xc3@\x1c\xc5_S\xb5\xa2-\x0ev\x10q\x88P\x9d,\x88\x8a8j\x15\x8aP!\xd4\n\xad:\x98\\\xfa\x05M\x1a\x92\x14\x17G\xc1\xb5\xe0\xe0\xc7b\xd5\xc1\xc5YW\x07WA\x10\xfc\x00qvpRt\x91\x12\xff\xd7\x14Z\xc4xp\xdc\x8fw\xf7\x1ew\xef\x00\xa1Vb\x9a\xd51\x0eh\xbam&\xe311\x9dY\x15\x03\xaf\xe8E\x17B\x18\xc6\xb4\xcc,cN\x92\x12\xf0\x1c_\xf7\xf0\xf1\xf5.\xca\xb3\xbc\xcf\xfd9Bj\xd6b\x80O$\x9ee\x86i\x13o\x10Oo\xda\x06\xe7}\xe20+\xc8*\xf19\xf1\x98I\x17$~\xe4\xba\xe2\xf2\x1b\xe7|\x83\x05\x9e\x196S\xc9y\xe20\xb1\x98oc\xa5\x8dY\xc1\xd4\x88\xa7\x88#\xaa\xa6S\xbe\x90vY\xe5\xbc\xc5Y+UX\xf3\x9e\xfc\x85\xc1\xac\xbe\xb2\xccu\x9aC\x88c\x11K\x90 BA\x05E\x94`#J\xabN\x8a\x85$\xed\xc7<\xfc\x83\r\xbfD.\x85\\E0r,\xa0\x0c\rr\xc3\x0f\xfe\x07\xbf\xbb\xb5r\x93\x13nR0\x06t\xbe8\xce\xc7\x08\x10\xd8\x05\xeaU\xc7\xf9>v\x9c\xfa\t\xe0\x7f\x06\xae\xf4\x96\xbf\\\x03f>I\xaf\xb6\xb4\xc8\x11\xd0\xb7\r\\\\\xb74e\x0f\xb8\xdc\x01\x06\x9e\x0c\xd9\x94\x1b\x92\x9f\xa6\x90\xcb\x01\xefg\xf4M\x19\xa0\xff\x16\xe8Ys{k\xee\xe3\xf4\x01HQW\x89\x1b\xe0\xe0\x10\x18\xcdS\xf6\xba\xc7\xbb\xbb\xdb{\xfb\xf7L\xb3\xbf\x1f\x98Nr\xb6\xd8\x8a\xb30\x00\x00\x00\x14IDATx\x9cc\xfc\xff\xff?\x03\x0c01 \x01\xdc\x1c\x00\x96n\x03\x05\xf2%\xbe\xf9\x00\x00\x00\x00IEND\xaeB`\x82"  # noqa E501
+
+
+@pytest.mark.parametrize(
+    "credentials,http_proxy",
+    [
+        # test required parameters only (using api_key)
+        ({"api_key": "apikey_123"}, None),
+        # test with robot_key instead of api_key
+        ({"robot_key": "robotkey_123"}, None),
+        # test proxy environment variable
+        ({"api_key": "apikey_123"}, "https://foo_bar.com:1234"),
+    ],
+)
+def test_robot_session_init(monkeypatch, credentials, http_proxy):
+    if http_proxy:
+        monkeypatch.setenv("HTTP_PROXY", http_proxy)
+    else:
+        monkeypatch.delenv("HTTP_PROXY", raising=False)
     robot_session = RobotSession(
-        robot_id="id_123", robot_name="name_123", robot_key="robotkey_123"
+        robot_id="id_123", robot_name="name_123", **credentials
     )
 
-    assert all(
-        [
-            robot_session.robot_id == "id_123",
-            robot_session.robot_name == "name_123",
-            robot_session.robot_key == "robotkey_123",
-            robot_session.agent_version.endswith("edgesdk_py"),
-            robot_session.endpoint == INORBIT_CLOUD_SDK_ROBOT_CONFIG_URL,
-            robot_session.use_ssl,
-            not robot_session.use_websockets,
-            robot_session.client._transport == "tcp",
-            robot_session.http_proxy is None,
-        ]
-    )
+    for attribute, value in credentials.items():
+        assert getattr(robot_session, attribute) == value
+    assert robot_session.robot_id == "id_123"
+    assert robot_session.robot_name == "name_123"
+    assert robot_session.agent_version.endswith("edgesdk_py")
+    assert robot_session.endpoint == INORBIT_CLOUD_SDK_ROBOT_CONFIG_URL
+    assert robot_session.use_ssl
+    assert robot_session.use_websockets == bool(http_proxy)
+    assert robot_session.client._transport == ("websockets" if http_proxy else "tcp")
+    assert robot_session.http_proxy == http_proxy
 
 
-def test_robot_session_connect(mock_mqtt_client, mock_inorbit_api):
-    robot_session = RobotSession(
-        robot_id="id_123", robot_name="name_123", api_key="apikey_123"
-    )
+def test_robot_session_connect(robot_session, mock_inorbit_api):
     robot_session.connect()
     # manually execute on_connect callback so robot status is sent
     robot_session._on_connect(..., ..., ..., 0)
@@ -80,9 +63,7 @@ def test_robot_session_connect(mock_mqtt_client, mock_inorbit_api):
     # check publish state was called with the correct API key
     robot_session.client.publish.assert_any_call(
         topic="r/id_123/state",
-        payload="1|robot_apikey_123|{}.edgesdk_py|name_123".format(
-            get_module_version()
-        ),
+        payload=ONLINE_STATE,
         qos=1,
         retain=True,
     )
@@ -95,38 +76,112 @@ def test_robot_session_connect(mock_mqtt_client, mock_inorbit_api):
     )
 
 
-def test_method_throttling():
+def test_robot_session_disconnect(connected_robot_session):
+    # Simulate successful MQTT client disconnection
+    connected_robot_session._is_disconnected = lambda: True
+    connected_robot_session.disconnect()
+
+    connected_robot_session.client.publish.assert_called_with(
+        topic="r/id_123/state",
+        payload=OFFLINE_STATE,
+        qos=1,
+        retain=True,
+    )
+    connected_robot_session.client.disconnect.assert_called_once()
+
+
+def test_robot_session_disconnect_closes_own_http_session(
+    mock_mqtt_client, mock_inorbit_api, fake_clock, mocker
+):
+    shared_http_session = Session()
     robot_session = RobotSession(
-        robot_id="id_123",
-        robot_name="name_123",
+        robot_id="id_123", robot_name="name_123", api_key="apikey_123"
+    )
+    shared_robot_session = RobotSession(
+        robot_id="id_456",
+        robot_name="name_456",
         api_key="apikey_123",
+        http_session=shared_http_session,
     )
+    close_spy = mocker.spy(robot_session._http_session, "close")
+    shared_close_spy = mocker.spy(shared_http_session, "close")
 
-    assert robot_session._should_publish_message(method="publish_pose")
-    assert not robot_session._should_publish_message(method="publish_pose")
-    assert not robot_session._should_publish_message(method="publish_pose")
-    robot_session._publish_throttling["publish_pose"]["last_ts"] = 0
-    assert robot_session._should_publish_message(method="publish_pose")
+    for session in (robot_session, shared_robot_session):
+        session.connect()
+        # Simulate successful MQTT client disconnection
+        session._is_disconnected = lambda: True
+        session.disconnect()
 
-    # Also test key based throttling
-    assert robot_session._should_publish_message(method="publish_key_values", key="foo")
-    assert not robot_session._should_publish_message(
-        method="publish_key_values", key="foo"
-    )
-    robot_session._publish_throttling["publish_key_values"]["foo"]["last_ts"] = 0
-    assert robot_session._should_publish_message(method="publish_key_values", key="foo")
+    close_spy.assert_called_once()
+    shared_close_spy.assert_not_called()
 
-    assert robot_session._should_publish_message(method="publish_key_values", key="bar")
-    assert not robot_session._should_publish_message(
-        method="publish_key_values", key="bar"
-    )
-    robot_session._publish_throttling["publish_key_values"]["bar"]["last_ts"] = 0
-    assert robot_session._should_publish_message(method="publish_key_values", key="bar")
 
+def test_robot_session_disconnect_timeout_closes_own_http_session(
+    connected_robot_session, mocker
+):
+    close_spy = mocker.spy(connected_robot_session._http_session, "close")
+    # Simulate the MQTT client never reporting the disconnection
+    connected_robot_session._is_disconnected = lambda: False
+
+    with pytest.raises(RuntimeError):
+        connected_robot_session.disconnect()
 
-def test_apply_footprint(requests_mock):
+    close_spy.assert_called_once()
+
+
+def test_get_robot_subtopic(robot_session):
+    topic = robot_session._get_robot_subtopic("ros/loc/pose")
+    assert topic == "r/id_123/ros/loc/pose"
+    # Topics are built once per subtopic
+    assert robot_session._get_robot_subtopic("ros/loc/pose") is topic
+
+    with pytest.raises(ValueError):
+        robot_session._get_robot_subtopic("/ros/loc/pose")
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"method": "publish_pose"},
+        {"method": "publish_key_values", "key": "foo"},
+        {"method": "publish_key_values", "key": "bar"},
+    ],
+)
+def test_method_throttling(robot_session, fake_clock, kwargs):
+    assert robot_session._should_publish_message(**kwargs)
+    assert not robot_session._should_publish_message(**kwargs)
+    fake_clock.now += 0.5
+    assert not robot_session._should_publish_message(**kwargs)
+    fake_clock.now += 0.5
+    assert robot_session._should_publish_message(**kwargs)
+
+
+# Configuration expected by the InOrbit REST API for the footprint applied in
+# ``test_apply_footprint``
+EXPECTED_FOOTPRINT_CONFIG = {
+    "apiVersion": "v0.1",
+    "kind": "RobotFootprint",
+    "metadata": {
+        "id": "all",
+        "scope": "robot/account_123/id_123",
+    },
+    "spec": {
+        "footprint": [
+            {"x": -0.5, "y": -0.5},
+            {"x": 0.3, "y": -0.5},
+            {"x": 0.3, "y": 0.5},
+            {"x": -0.5, "y": 0.5},
+        ],
+        "radius": 0.2,
+    },
+}
+
+
+def test_apply_footprint(robot_session, requests_mock):
+    # Only requests with the expected configuration body are answered
     adapter = requests_mock.post(
         f"{INORBIT_REST_API_URL}/configuration/apply",
+        additional_matcher=lambda request: request.json() == EXPECTED_FOOTPRINT_CONFIG,
         json={"operationStatus": "SUCCESS"},
     )
     footprint = RobotFootprintSpec(
@@ -140,11 +195,6 @@ def test_apply_footprint(requests_mock):
     )
 
     # Missing account_id
-    robot_session = RobotSession(
-        robot_id="id_123",
-        robot_name="name_123",
-        api_key="apikey_123",
-    )
     with pytest.raises(ValueError):
         robot_session.apply_footprint(footprint)
 
@@ -157,23 +207,6 @@ def test_apply_footprint(requests_mock):
     )
     robot_session.apply_footprint(footprint)
     assert adapter.called_once
-    assert adapter.last_request.json() == {
-        "apiVersion": "v0.1",
-        "kind": "RobotFootprint",
-        "metadata": {
-            "id": "all",
-            "scope": "robot/account_123/id_123",
-        },
-        "spec": {
-            "footprint": [
-                {"x": -0.5, "y": -0.5},
-                {"x": 0.3, "y": -0.5},
-                {"x": 0.3, "y": 0.5},
-                {"x": -0.5, "y": 0.5},
-            ],
-            "radius": 0.2,
-        },
-    }
 
     # HTTP error
     requests_mock.post(f"{INORBIT_REST_API_URL}/configuration/apply", status_code=400)
@@ -181,10 +214,10 @@ def test_apply_footprint(requests_mock):
         robot_session.apply_footprint(footprint)
 
 
-def test_robot_map_data():
+def test_robot_map_data(monkeypatch, mocker, tmp_path):
     # Test with good file
     robot_map = RobotMap(
-        file=f"{os.path.dirname(__file__)}/utils/test_map.png",
+        file=MAP_FILE,
         map_id="map_id",
         frame_id="frame_id",
         origin_x=1,
@@ -192,12 +225,9 @@ def test_robot_map_data():
         resolution=0.005,
     )
     pixels, hash, dimensions = robot_map.get_image_data()
-    assert hash == 4565286020005755223
+    assert hash == EXPECTED_HASH
     assert dimensions == (4, 4)
-    assert (
-        pixels
-        == b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x04\x00\x00\x00\x04\x08\x02\x00\x00\x00&\x93\t)\x00\x00\x01\x84iCCPICC Profile\x00\x00x\x9c}\x91=H\xc3@\x1c\xc5_S\xb5\xa2-\x0ev\x10q\x88P\x9d,\x88\x8a8j\x15\x8aP!\xd4\n\xad:\x98\\\xfa\x05M\x1a\x92\x14\x17G\xc1\xb5\xe0\xe0\xc7b\xd5\xc1\xc5YW\x07WA\x10\xfc\x00qvpRt\x91\x12\xff\xd7\x14Z\xc4xp\xdc\x8fw\xf7\x1ew\xef\x00\xa1Vb\x9a\xd51\x0eh\xbam&\xe311\x9dY\x15\x03\xaf\xe8E\x17B\x18\xc6\xb4\xcc,cN\x92\x12\xf0\x1c_\xf7\xf0\xf1\xf5.\xca\xb3\xbc\xcf\xfd9Bj\xd6b\x80O$\x9ee\x86i\x13o\x10Oo\xda\x06\xe7}\xe20+\xc8*\xf19\xf1\x98I\x17$~\xe4\xba\xe2\xf2\x1b\xe7|\x83\x05\x9e\x196S\xc9y\xe20\xb1\x98oc\xa5\x8dY\xc1\xd4\x88\xa7\x88#\xaa\xa6S\xbe\x90vY\xe5\xbc\xc5Y+UX\xf3\x9e\xfc\x85\xc1\xac\xbe\xb2\xccu\x9aC\x88c\x11K\x90 BA\x05E\x94`#J\xabN\x8a\x85$\xed\xc7<\xfc\x83\r\xbfD.\x85\\E0r,\xa0\x0c\rr\xc3\x0f\xfe\x07\xbf\xbb\xb5r\x93\x13nR0\x06t\xbe8\xce\xc7\x08\x10\xd8\x05\xeaU\xc7\xf9>v\x9c\xfa\t\xe0\x7f\x06\xae\xf4\x96\xbf\\\x03f>I\xaf\xb6\xb4\xc8\x11\xd0\xb7\r\\\\\xb74e\x0f\xb8\xdc\x01\x06\x9e\x0c\xd9\x94\x1b\x92\x9f\xa6\x90\xcb\x01\xefg\xf4M\x19\xa0\xff\x16\xe8Ys{k\xee\xe3\xf4\x01HQW\x89\x1b\xe0\xe0\x10\x18\xcdS\xf6\xba\xc7\xbb\xbb\xdb{\xfb\xf7L\xb3\xbf\x1f\x98Nr\xb6\xd8\x8a\xb30\x00\x00\x00\x14IDATx\x9cc\xfc\xff\xff?\x03\x0c01 \x01\xdc\x1c\x00\x96n\x03\x05\xf2%\xbe\xf9\x00\x00\x00\x00IEND\xaeB`\x82"  # noqa E501
-    )
+    assert pixels == EXPECTED_PIXELS
 
     # Test with bad file
     robot_map = RobotMap(
@@ -211,9 +241,14 @@ def test_robot_map_data():
     with pytest.raises(FileNotFoundError):
         robot_map.get_image_data()
 
-    # Test cache invalidation
+    # Test cache invalidation on a private copy of the map, faking the copy's
+    # modification time
+    map_copy = str(tmp_path / "test_map.png")
+    shutil.copyfile(MAP_FILE, map_copy)
+    mtimes = {map_copy: 1.0}
+    monkeypatch.setattr(os.path, "getmtime", lambda path: mtimes[path])
     robot_map = RobotMap(
-        file=f"{os.path.dirname(__file__)}/utils/test_map.png",
+        file=map_copy,
         map_id="map_id",
         frame_id="frame_id",
         origin_x=1,
@@ -221,25 +256,55 @@ def test_robot_map_data():
         resolution=0.005,
     )
     pixels, hash, dimensions = robot_map.get_image_data()
-    robot_map._refresh_data = MagicMock()
+    refresh_data = mocker.spy(robot_map, "_refresh_data")
     # File was not updated. Should not refresh data
     pixels, hash, dimensions = robot_map.get_image_data()
-    robot_map._refresh_data.assert_not_called()
+    refresh_data.assert_not_called()
     # Update the file's modification time
-    os.utime(robot_map.file, None)
+    mtimes[map_copy] = 2.0
     pixels, hash, dimensions = robot_map.get_image_data()
-    robot_map._refresh_data.assert_called_once()
-
-
-def test_robot_session_publishes_map_data(
-    mock_mqtt_client, mock_inorbit_api, mock_popen
-):
-    robot_session = RobotSession(
-        robot_id="id_123",
-        robot_name="name_123",
-        api_key="apikey_123",
+    refresh_data.assert_called_once()
+    assert (pixels, hash) == (EXPECTED_PIXELS, EXPECTED_HASH)
+
+
+def test_robot_map_data_is_shared():
+    robot_maps = [
+        RobotMap(
+            file=MAP_FILE,
+            map_id=map_id,
+            frame_id="frame_id",
+            origin_x=1,
+            origin_y=2,
+            resolution=0.005,
+        )
+        for map_id in ("map_id", "another_map_id")
+    ]
+    pixels1, hash1, _ = robot_maps[0].get_image_data()
+    pixels2, hash2, _ = robot_maps[1].get_image_data()
+    # The file is read once and its data is shared by both maps
+    assert pixels1 is pixels2
+    assert hash1 == hash2
+
+
+def _build_map_message(pixels=b""):
+    # Expected ``MapMessage`` for the test map published by the tests below
+    return MapMessage(
+        width=4,
+        height=4,
+        data_hash=EXPECTED_HASH,
+        label="map_id",
+        map_id="map_id",
+        frame_id="frame_id",
+        x=1,
+        y=2,
+        resolution=0.005,
+        ts=123,
+        is_update=False,
+        pixels=pixels,
     )
 
+
+def test_robot_session_publishes_map_data(robot_session, mock_inorbit_api, mock_popen):
     # Test with bad file
     robot_session.publish_map(
         file="you/are/not/going/to/find.me",
@@ -256,7 +321,7 @@ def test_robot_session_publishes_map_data(
 
     # Tets without force_upload
     robot_session.publish_map(
-        file=f"{os.path.dirname(__file__)}/utils/test_map.png",
+        file=MAP_FILE,
         map_id="map_id",
         frame_id="frame_id",
         x=1,
@@ -267,29 +332,18 @@ def test_robot_session_publishes_map_data(
         force_upload=False,
     )
 
-    expected_payload = MapMessage()
-    expected_payload.width = 4
-    expected_payload.height = 4
-    expected_payload.data_hash = 4565286020005755223
-    expected_payload.label = "map_id"
-    expected_payload.map_id = "map_id"
-    expected_payload.frame_id = "frame_id"
-    expected_payload.x = 1
-    expected_payload.y = 2
-    expected_payload.resolution = 0.005
-    expected_payload.ts = 123
-    expected_payload.is_update = False
+    expected_payload = _build_map_message()
 
     robot_session.client.publish.assert_any_call(
         topic="r/id_123/ros/loc/map2",
-        payload=bytearray(expected_payload.SerializeToString()),
+        payload=expected_payload.SerializeToString(),
         qos=1,
         retain=True,
     )
 
     # Test with force_upload
     robot_session.publish_map(
-        file=f"{os.path.dirname(__file__)}/utils/test_map.png",
+        file=MAP_FILE,
         map_id="map_id",
         frame_id="frame_id",
         x=1,
@@ -300,23 +354,35 @@ def test_robot_session_publishes_map_data(
         force_upload=True,
     )
 
-    expected_payload = MapMessage()
-    expected_payload.width = 4
-    expected_payload.height = 4
-    expected_payload.data_hash = 4565286020005755223
-    expected_payload.label = "map_id"
-    expected_payload.map_id = "map_id"
-    expected_payload.frame_id = "frame_id"
-    expected_payload.x = 1
-    expected_payload.y = 2
-    expected_payload.resolution = 0.005
-    expected_payload.ts = 123
-    expected_payload.is_update = False
-    expected_payload.pixels = b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x04\x00\x00\x00\x04\x08\x02\x00\x00\x00&\x93\t)\x00\x00\x01\x84iCCPICC Profile\x00\x00x\x9c}\x91=H\xc3@\x1c\xc5_S\xb5\xa2-\x0ev\x10q\x88P\x9d,\x88\x8a8j\x15\x8aP!\xd4\n\xad:\x98\\\xfa\x05M\x1a\x92\x14\x17G\xc1\xb5\xe0\xe0\xc7b\xd5\xc1\xc5YW\x07WA\x10\xfc\x00qvpRt\x91\x12\xff\xd7\x14Z\xc4xp\xdc\x8fw\xf7\x1ew\xef\x00\xa1Vb\x9a\xd51\x0eh\xbam&\xe311\x9dY\x15\x03\xaf\xe8E\x17B\x18\xc6\xb4\xcc,cN\x92\x12\xf0\x1c_\xf7\xf0\xf1\xf5.\xca\xb3\xbc\xcf\xfd9Bj\xd6b\x80O$\x9ee\x86i\x13o\x10Oo\xda\x06\xe7}\xe20+\xc8*\xf19\xf1\x98I\x17$~\xe4\xba\xe2\xf2\x1b\xe7|\x83\x05\x9e\x196S\xc9y\xe20\xb1\x98oc\xa5\x8dY\xc1\xd4\x88\xa7\x88#\xaa\xa6S\xbe\x90vY\xe5\xbc\xc5Y+UX\xf3\x9e\xfc\x85\xc1\xac\xbe\xb2\xccu\x9aC\x88c\x11K\x90 BA\x05E\x94`#J\xabN\x8a\x85$\xed\xc7<\xfc\x83\r\xbfD.\x85\\E0r,\xa0\x0c\rr\xc3\x0f\xfe\x07\xbf\xbb\xb5r\x93\x13nR0\x06t\xbe8\xce\xc7\x08\x10\xd8\x05\xeaU\xc7\xf9>v\x9c\xfa\t\xe0\x7f\x06\xae\xf4\x96\xbf\\\x03f>I\xaf\xb6\xb4\xc8\x11\xd0\xb7\r\\\\\xb74e\x0f\xb8\xdc\x01\x06\x9e\x0c\xd9\x94\x1b\x92\x9f\xa6\x90\xcb\x01\xefg\xf4M\x19\xa0\xff\x16\xe8Ys{k\xee\xe3\xf4\x01HQW\x89\x1b\xe0\xe0\x10\x18\xcdS\xf6\xba\xc7\xbb\xbb\xdb{\xfb\xf7L\xb3\xbf\x1f\x98Nr\xb6\xd8\x8a\xb30\x00\x00\x00\x14IDATx\x9cc\xfc\xff\xff?\x03\x0c01 \x01\xdc\x1c\x00\x96n\x03\x05\xf2%\xbe\xf9\x00\x00\x00\x00IEND\xaeB`\x82"  # noqa E501
+    expected_payload = _build_map_message(pixels=EXPECTED_PIXELS)
 
     robot_session.client.publish.assert_any_call(
         topic="r/id_123/ros/loc/map2",
-        payload=bytearray(expected_payload.SerializeToString()),
+        payload=expected_payload.SerializeToString(),
         qos=1,
         retain=True,
     )
+
+
+@pytest.mark.parametrize(
+    "num_points,expected_num_points",
+    [
+        (3, 3),
+        # One point over the limit is enough to exercise path truncation
+        (ROBOT_PATH_POINTS_LIMIT + 1, ROBOT_PATH_POINTS_LIMIT),
+    ],
+)
+def test_robot_session_publishes_path_data(
+    robot_session, mock_inorbit_api, num_points, expected_num_points
+):
+    robot_session.connect()
+
+    path_points = [(i, -i) for i in range(num_points)]
+    robot_session.publish_path(path_points=path_points, ts=123)
+
+    publish_kwargs = robot_session.client.publish.call_args.kwargs
+    assert publish_kwargs["topic"] == "r/id_123/ros/loc/path"
+    msg = PathDataMessage.FromString(bytes(publish_kwargs["payload"]))
+    assert msg.ts == 123
+    [path] = msg.paths
+    assert [(p.x, p.y) for p in path.points] == path_points[:expected_num_points]
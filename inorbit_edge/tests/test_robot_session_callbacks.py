@@ -2,12 +2,10 @@
 # -*- coding: utf-8 -*-
 
 import os
-from unittest.mock import MagicMock, call
+from unittest.mock import Mock, call
 import pytest
-from inorbit_edge.robot import RobotSession
-from paho.mqtt.client import MQTTMessage
+from types import SimpleNamespace
 from inorbit_edge.inorbit_pb2 import Echo
-import time
 from inorbit_edge.inorbit_pb2 import (
     CustomScriptCommandMessage,
     CustomCommandRosMessage,
@@ -15,42 +13,46 @@ from inorbit_edge.inorbit_pb2 import (
 )
 from inorbit_edge.tests.utils.helpers import test_robot_session_connect_helper
 
-
-def test_builtin_callbacks(mock_mqtt_client, mock_inorbit_api):
-    robot_session = RobotSession(
-        robot_id="id_123",
-        robot_name="name_123",
-        api_key="apikey_123",
-    )
-    # connect robot_session, so it populates properties with API response data
-    robot_session.connect()
-    robot_session._on_connect(..., ..., ..., 0)
-
-    robot_session.client.subscribe.assert_any_call(topic="r/id_123/ros/loc/set_pose")
-    robot_session.client.subscribe.assert_any_call(
-        topic="r/id_123/custom_command/script/command"
-    )
-
-
-def test_robot_session_register_command_callback(mock_mqtt_client, mock_inorbit_api):
+MAP_FILE = f"{os.path.dirname(__file__)}/utils/test_map.png"
+
+# Serialized payloads of the command messages received by the tests below
+POSE_PAYLOAD = b"1|123456789|1.23|4.56|-0.1"
+SCRIPT_COMMAND_PAYLOAD = CustomScriptCommandMessage(
+    file_name="foo", arg_options=["a", "b"], execution_id="1"
+).SerializeToString()
+ROS_COMMAND_PAYLOAD = CustomCommandRosMessage(cmd="hello world").SerializeToString()
+# Map requests matching the test map's hash, and with a hash of another map image
+MAP_REQUEST_PAYLOAD = MapRequest(
+    label="map_id", data_hash=4565286020005755223
+).SerializeToString()
+STALE_MAP_REQUEST_PAYLOAD = MapRequest(
+    label="map_id", data_hash=123
+).SerializeToString()
+
+
+def test_builtin_callbacks(connected_robot_session):
+    subscribed_topics = {
+        c.kwargs["topic"]
+        for c in connected_robot_session.client.subscribe.call_args_list
+    }
+    assert subscribed_topics == {
+        "r/id_123/ros/loc/set_pose",
+        "r/id_123/custom_command/script/command",
+        "r/id_123/custom_command/ros",
+        "r/id_123/ros/loc/nav_goal",
+        "r/id_123/in_cmd",
+        "r/id_123/ros/loc/mapreq",
+    }
+
+
+def test_robot_session_register_command_callback(connected_robot_session):
     def my_command_handler(*_):
         pass
 
-    robot_session = RobotSession(
-        robot_id="id_123",
-        robot_name="name_123",
-        api_key="apikey_123",
-    )
-    robot_session.register_command_callback(my_command_handler)
-
-    # connect robot_session, so it populates properties with API response data
-    robot_session.connect()
-    # manually execute on_connect callback, so the ``custom_command_callback``
-    # callback gets registered
-    robot_session._on_connect(..., ..., ..., 0)
+    connected_robot_session.register_command_callback(my_command_handler)
 
-    assert my_command_handler in robot_session.command_callbacks
-    robot_session.client.subscribe.assert_has_calls(
+    assert my_command_handler in connected_robot_session.command_callbacks
+    connected_robot_session.client.subscribe.assert_has_calls(
         [
             call(topic="r/id_123/ros/loc/set_pose"),
             call(topic="r/id_123/custom_command/script/command"),
@@ -59,40 +61,32 @@ def test_robot_session_register_command_callback(mock_mqtt_client, mock_inorbit_
             call(topic="r/id_123/in_cmd"),
         ]
     )
-    assert robot_session.client.subscribe.call_count == 6
+    assert connected_robot_session.client.subscribe.call_count == 6
 
 
-def test_robot_session_echo(mocker, mock_mqtt_client, mock_inorbit_api):
+def test_robot_session_echo(connected_robot_session, fake_clock):
     def my_command_handler(*_):
         pass
 
-    robot_session = RobotSession(
-        robot_id="id_123",
-        robot_name="name_123",
-        api_key="apikey_123",
-    )
-    robot_session.register_command_callback(my_command_handler)
-
-    # connect robot_session, so it populates properties with API response data
-    robot_session.connect()
-    # manually execute on_connect callback, so the ``custom_command_callback``
-    # callback gets registered
-    robot_session._on_connect(..., ..., ..., 0)
+    connected_robot_session.register_command_callback(my_command_handler)
 
-    msg = MQTTMessage(topic=b"r/id_123/ros/loc/set_pose")
-    msg.payload = "1|123456789|1.23|4.56|-0.1".encode()
+    msg = SimpleNamespace(
+        topic="r/id_123/ros/loc/set_pose",
+        payload=POSE_PAYLOAD,
+    )
 
-    with mocker.patch.object(time, "time", return_value=123456.789):
-        robot_session._on_message(..., ..., msg)
+    fake_clock.now = 123456.789
+    connected_robot_session._on_message(..., ..., msg)
 
-        echo_msg = Echo()
-        echo_msg.topic = "r/id_123/ros/loc/set_pose"
-        echo_msg.time_stamp = int(time.time() * 1000)
-        echo_msg.string_payload = msg.payload.decode("utf-8", errors="ignore")
+    echo_msg = Echo(
+        topic="r/id_123/ros/loc/set_pose",
+        time_stamp=123456789,
+        string_payload="1|123456789|1.23|4.56|-0.1",
+    )
 
-    robot_session.client.publish.assert_any_call(
+    connected_robot_session.client.publish.assert_any_call(
         topic="r/id_123/echo",
-        payload=bytearray(echo_msg.SerializeToString()),
+        payload=echo_msg.SerializeToString(),
         qos=0,
         retain=False,
     )
@@ -103,8 +97,8 @@ def test_robot_session_echo(mocker, mock_mqtt_client, mock_inorbit_api):
     [
         (
             {
-                "topic": b"r/id_123/ros/loc/set_pose",
-                "payload": "1|123456789|1.23|4.56|-0.1".encode(),
+                "topic": "r/id_123/ros/loc/set_pose",
+                "payload": POSE_PAYLOAD,
             },
             {
                 "command_name": "initialPose",
@@ -113,17 +107,15 @@ def test_robot_session_echo(mocker, mock_mqtt_client, mock_inorbit_api):
         ),
         (
             {
-                "topic": b"r/id_123/custom_command/script/command",
-                "payload": CustomScriptCommandMessage(
-                    file_name="foo", arg_options=["a", "b"], execution_id="1"
-                ).SerializeToString(),
+                "topic": "r/id_123/custom_command/script/command",
+                "payload": SCRIPT_COMMAND_PAYLOAD,
             },
             {"command_name": "customCommand", "command_args": ["foo", ["a", "b"]]},
         ),
         (
             {
-                "topic": b"r/id_123/ros/loc/nav_goal",
-                "payload": "1|123456789|1.23|4.56|-0.1".encode(),
+                "topic": "r/id_123/ros/loc/nav_goal",
+                "payload": POSE_PAYLOAD,
             },
             {
                 "command_name": "navGoal",
@@ -132,40 +124,24 @@ def test_robot_session_echo(mocker, mock_mqtt_client, mock_inorbit_api):
         ),
         (
             {
-                "topic": b"r/id_123/custom_command/ros",
-                "payload": CustomCommandRosMessage(
-                    cmd="hello world"
-                ).SerializeToString(),
+                "topic": "r/id_123/custom_command/ros",
+                "payload": ROS_COMMAND_PAYLOAD,
             },
             {"command_name": "message", "command_args": ["hello world"]},
         ),
     ],
 )
 def test_robot_session_executes_command_callback_on_message(
-    mock_mqtt_client, mock_inorbit_api, test_input, expected
+    connected_robot_session, test_input, expected
 ):
-    # Mock command handler.
-    my_command_handler = MagicMock()
-    # Set command handler mock method's name as it's accessed by the RobotSession class
-    my_command_handler.configure_mock(**{"__name__": "my_command_handler"})
-
-    robot_session = RobotSession(
-        robot_id="id_123",
-        robot_name="name_123",
-        api_key="apikey_123",
-    )
-    robot_session.register_command_callback(my_command_handler)
+    # Mock command handler. Its name is accessed by the RobotSession class
+    my_command_handler = Mock(__name__="my_command_handler")
 
-    # connect robot_session, so it populates properties with API response data
-    robot_session.connect()
-    # manually execute on_connect callback, so the ``custom_command_callback``
-    # callback gets registered
-    robot_session._on_connect(..., ..., ..., 0)
+    connected_robot_session.register_command_callback(my_command_handler)
 
-    msg = MQTTMessage(topic=test_input["topic"])
-    msg.payload = test_input["payload"]
+    msg = SimpleNamespace(topic=test_input["topic"], payload=test_input["payload"])
 
-    robot_session._on_message(..., ..., msg)
+    connected_robot_session._on_message(..., ..., msg)
 
     my_command_handler.assert_called_once()
     call_args, call_kwargs = my_command_handler.call_args_list[0]
@@ -184,49 +160,61 @@ def test_robot_session_executes_command_callback_on_message(
     assert command_options["metadata"] == {}
 
 
-def test_robot_session_executes_commands(
-    mock_mqtt_client, mock_inorbit_api, mock_popen
+@pytest.mark.parametrize(
+    "x,y,theta",
+    [
+        ("0", "0", "0"),
+        ("-0.0", "0.0", "-0.0"),
+        ("1e-07", "-2.5e+06", "3.141592653589793"),
+        ("-123456.789", "987654.321", "-3.141592653589793"),
+    ],
+)
+@pytest.mark.parametrize(
+    "topic,command_name",
+    [
+        ("r/id_123/ros/loc/set_pose", "initialPose"),
+        ("r/id_123/ros/loc/nav_goal", "navGoal"),
+    ],
+)
+def test_robot_session_passes_pose_values_verbatim(
+    connected_robot_session, topic, command_name, x, y, theta
 ):
-    robot_session = RobotSession(
-        robot_id="id_123",
-        robot_name="name_123",
-        api_key="apikey_123",
+    my_command_handler = Mock(__name__="my_command_handler")
+    connected_robot_session.register_command_callback(my_command_handler)
+
+    payload = f"7|123456789|{x}|{y}|{theta}".encode("utf-8")
+    connected_robot_session._on_message(
+        ..., ..., SimpleNamespace(topic=topic, payload=payload)
     )
 
+    my_command_handler.assert_called_once()
+    [name, args, _] = my_command_handler.call_args.args
+    assert name == command_name
+    assert args == [{"x": x, "y": y, "theta": theta}]
+
+
+def test_robot_session_executes_commands(robot_session, mock_inorbit_api, mock_popen):
     robot_session.register_commands_path("./user_scripts", r".*\.sh")
 
     # Tests asserted here
     test_robot_session_connect_helper(robot_session, mock_popen)
 
 
-def test_robot_session_handles_map_requests(
-    mock_mqtt_client, mock_inorbit_api, mock_popen
-):
-    robot_session = RobotSession(
-        robot_id="id_123",
-        robot_name="name_123",
-        api_key="apikey_123",
-    )
-    robot_session._send_map = MagicMock()
-
-    # connect robot_session, so it populates properties with API response data
-    robot_session.connect()
-    # manually execute on_connect callback, so the ``custom_command_callback``
-    # callback gets registered
-    robot_session._on_connect(..., ..., ..., 0)
+def test_robot_session_handles_map_requests(connected_robot_session, mock_popen):
+    connected_robot_session._send_map = Mock()
 
-    msg = MQTTMessage(topic=b"r/id_123/ros/loc/mapreq")
-    msg.payload = MapRequest(
-        label="map_id", data_hash=4565286020005755223
-    ).SerializeToString()
+    msg = SimpleNamespace(
+        topic="r/id_123/ros/loc/mapreq",
+        payload=MAP_REQUEST_PAYLOAD,
+    )
 
     # test it doesn't publish if the map hasn't been published before
-    robot_session._on_message(..., ..., msg)
-    robot_session.client._publish_map_bytes.assert_not_called()
+    connected_robot_session._on_message(..., ..., msg)
+    connected_robot_session._send_map.assert_not_called()
 
     # test it publishes the map if it has been published before
-    robot_session.publish_map(
-        file=f"{os.path.dirname(__file__)}/utils/test_map.png",
+    connected_robot_session.publish_map(
+        file=MAP_FILE,
         map_id="map_id",
         frame_id="frame_id",
         x=1,
@@ -236,15 +224,15 @@ def test_robot_session_handles_map_requests(
         is_update=False,
         force_upload=False,
     )
-    robot_session._send_map.assert_called_once()
-    args1 = robot_session._send_map.call_args_list[0]
+    connected_robot_session._send_map.assert_called_once()
+    args1 = connected_robot_session._send_map.call_args_list[0]
     assert args1.kwargs["include_pixels"] is False
-    robot_session._on_message(..., ..., msg)
-    assert robot_session._send_map.call_count == 2
-    args2 = robot_session._send_map.call_args_list[1]
+    connected_robot_session._on_message(..., ..., msg)
+    assert connected_robot_session._send_map.call_count == 2
+    args2 = connected_robot_session._send_map.call_args_list[1]
     assert args2.kwargs["include_pixels"] is True
 
     # test it doesn't publish if the hash doesn't match
-    msg.payload = MapRequest(label="map_id", data_hash=123).SerializeToString()
-    robot_session._on_message(..., ..., msg)
-    robot_session.client._publish_map_bytes.assert_not_called()
+    msg.payload = STALE_MAP_REQUEST_PAYLOAD
+    connected_robot_session._on_message(..., ..., msg)
+    assert connected_robot_session._send_map.call_count == 2
@@ -1,76 +1,72 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from unittest.mock import MagicMock
-from paho.mqtt.client import MQTTMessage
+from types import SimpleNamespace
+from unittest.mock import Mock
+import pytest
 from inorbit_edge.robot import RobotSessionFactory
 from inorbit_edge.inorbit_pb2 import CustomScriptCommandMessage
 from inorbit_edge.tests.utils.helpers import test_robot_session_connect_helper
 
 
-def test_robot_factory_build(mock_mqtt_client):
+@pytest.mark.parametrize(
+    "build_args,build_kwargs,expected",
+    [
+        # Robot name specified as a positional argument
+        (
+            ["id_123", "name_123"],
+            {},
+            {"robot_id": "id_123", "robot_name": "name_123", "api_key": "apikey_123"},
+        ),
+        # Robot session launched using a robot key for authentication. The robot
+        # key and name are specified as kwargs.
+        (
+            ["id_123"],
+            {"robot_name": "name_123", "robot_key": "robotkey_123"},
+            {
+                "robot_id": "id_123",
+                "robot_name": "name_123",
+                "robot_key": "robotkey_123",
+            },
+        ),
+        # Robot session launched using an API key for authentication. The robot
+        # name is specified as a kwarg.
+        (
+            ["id_456"],
+            {"robot_name": "name_456"},
+            {"robot_id": "id_456", "robot_name": "name_456", "api_key": "apikey_123"},
+        ),
+    ],
+)
+def test_robot_factory_build(mock_mqtt_client, build_args, build_kwargs, expected):
     robot_session_factory = RobotSessionFactory(
         api_key="apikey_123", endpoint="http://myendpoint/"
     )
-    robot_session = robot_session_factory.build("id_123", "name_123")
+    robot_session = robot_session_factory.build(*build_args, **build_kwargs)
 
-    assert all(
-        [
-            robot_session.robot_id == "id_123",
-            robot_session.robot_name == "name_123",
-            robot_session.api_key == "apikey_123",
-            robot_session.agent_version.endswith("edgesdk_py"),
-            robot_session.endpoint == "http://myendpoint/",
-            robot_session.http_proxy is None,
-        ]
-    )
+    for attribute, value in expected.items():
+        assert getattr(robot_session, attribute) == value
+    assert robot_session.agent_version.endswith("edgesdk_py")
+    assert robot_session.endpoint == "http://myendpoint/"
+    assert robot_session.http_proxy is None
 
-    # Robot session launched using a robot key for authentication. The robot
-    # key and name are specified as kwargs.
-    robot_session = robot_session_factory.build(
-        "id_123", **{"robot_name": "name_123", "robot_key": "robotkey_123"}
-    )
 
-    assert all(
-        [
-            robot_session.robot_id == "id_123",
-            robot_session.robot_name == "name_123",
-            robot_session.robot_key == "robotkey_123",
-            robot_session.agent_version.endswith("edgesdk_py"),
-            robot_session.endpoint == "http://myendpoint/",
-            robot_session.http_proxy is None,
-        ]
-    )
+def test_built_robot_sessions_share_http_session(mock_mqtt_client):
+    robot_session_factory = RobotSessionFactory(api_key="apikey_123")
 
-    # Robot session launched using an API key for authentication. The robot name
-    # is specified as a kwarg.
-    robot_session_factory = RobotSessionFactory(
-        api_key="apikey_123", endpoint="http://myendpoint/"
-    )
+    robot_session1 = robot_session_factory.build("id_123", "name_123")
+    robot_session2 = robot_session_factory.build("id_456", "name_456")
 
-    robot_session = robot_session_factory.build("id_456", **{"robot_name": "name_456"})
-
-    assert all(
-        [
-            robot_session.robot_id == "id_456",
-            robot_session.robot_name == "name_456",
-            robot_session.api_key == "apikey_123",
-            robot_session.agent_version.endswith("edgesdk_py"),
-            robot_session.endpoint == "http://myendpoint/",
-            robot_session.http_proxy is None,
-        ]
-    )
+    assert robot_session1._http_session is robot_session_factory.http_session
+    assert robot_session2._http_session is robot_session_factory.http_session
 
 
 def test_built_robot_session_executes_command_callback_on_message(
-    mock_mqtt_client, mock_inorbit_api
+    mock_mqtt_client, mock_inorbit_api, fake_clock
 ):
-    # Mock command handler.
-    my_command_handler = MagicMock()
-    another_command_handler = MagicMock()
-    # Set command handler mock method's name as it's accessed by the RobotSession class
-    my_command_handler.configure_mock(**{"__name__": "my_command_handler"})
-    another_command_handler.configure_mock(**{"__name__": "another_command_handler"})
+    # Mock command handlers. Their names are accessed by the RobotSession class
+    my_command_handler = Mock(__name__="my_command_handler")
+    another_command_handler = Mock(__name__="another_command_handler")
 
     robot_session_factory = RobotSessionFactory(api_key="apikey_123")
     robot_session_factory.register_command_callback(another_command_handler)
@@ -84,10 +80,12 @@ def test_built_robot_session_executes_command_callback_on_message(
     # callback gets registered
     robot_session._on_connect(..., ..., ..., 0)
 
-    msg = MQTTMessage(topic=b"r/id_123/custom_command/script/command")
-    msg.payload = CustomScriptCommandMessage(
-        file_name="foo", arg_options=["a", "b"], execution_id="1"
-    ).SerializeToString()
+    msg = SimpleNamespace(
+        topic="r/id_123/custom_command/script/command",
+        payload=CustomScriptCommandMessage(
+            file_name="foo", arg_options=["a", "b"], execution_id="1"
+        ).SerializeToString(),
+    )
 
     robot_session._on_message(..., ..., msg)
 
@@ -112,7 +110,7 @@ def _test_command_handler_helper(command_handler):
 
 
 def test_built_robot_session_executes_commands(
-    mock_mqtt_client, mock_inorbit_api, mock_popen
+    mock_mqtt_client, mock_inorbit_api, mock_popen, fake_clock
 ):
     robot_session_factory = RobotSessionFactory(api_key="apikey_123")
     robot_session_factory.register_commands_path("./user_scripts", r".*\.sh")
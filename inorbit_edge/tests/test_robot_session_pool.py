@@ -5,7 +5,7 @@ from inorbit_edge.robot import RobotSessionFactory, RobotSessionPool
 import os
 
 
-def test_robot_session_pool_get_session(mock_mqtt_client, mock_inorbit_api):
+def test_robot_session_pool_get_session(mock_mqtt_client, mock_inorbit_api, fake_clock):
     factory = RobotSessionFactory(api_key="apikey_123")
     pool = RobotSessionPool(factory)
 
@@ -13,19 +13,17 @@ def test_robot_session_pool_get_session(mock_mqtt_client, mock_inorbit_api):
     robot1_copy = pool.get_session("id_1", "name_1")
     robot2 = pool.get_session("id_2", "name_2")
 
-    assert all(
-        [
-            robot1.robot_id == "id_1",
-            robot1.robot_name == "name_1",
-            robot1 is not robot2,
-            robot1 is robot1_copy,
-        ]
-    )
+    assert robot1.robot_id == "id_1"
+    assert robot1.robot_name == "name_1"
+    assert robot1 is not robot2
+    assert robot1 is robot1_copy
 
 
 # The robot config data (name, robot_key) for the `get_session` method is
 # provided using a config yaml.
-def test_robot_session_pool_get_session_from_yaml(mock_mqtt_client, mock_inorbit_api):
+def test_robot_session_pool_get_session_from_yaml(
+    mock_mqtt_client, mock_inorbit_api, fake_clock
+):
     dirname = os.path.dirname(__file__)
     robot_config_yaml = os.path.join(dirname, "config/robots_config_robot_key.yaml")
 
@@ -36,17 +34,13 @@ def test_robot_session_pool_get_session_from_yaml(mock_mqtt_client, mock_inorbit
     robot1_copy = pool.get_session("test_robot123")
     robot2 = pool.get_session("test_robot456")
 
-    assert all(
-        [
-            robot1.robot_id == "test_robot123",
-            robot1.robot_name == "robot123",
-            robot1 is not robot2,
-            robot1 is robot1_copy,
-        ]
-    )
+    assert robot1.robot_id == "test_robot123"
+    assert robot1.robot_name == "robot123"
+    assert robot1 is not robot2
+    assert robot1 is robot1_copy
 
 
-def test_robot_session_pool_free(mock_mqtt_client, mock_inorbit_api):
+def test_robot_session_pool_free(mock_mqtt_client, mock_inorbit_api, fake_clock):
     factory = RobotSessionFactory(api_key="apikey_123")
     pool = RobotSessionPool(factory)
 
@@ -58,12 +52,16 @@ def test_robot_session_pool_free(mock_mqtt_client, mock_inorbit_api):
 
     pool.free_robot_session("id_1")
 
-    assert all([not pool.has_robot("id_1"), pool.has_robot("id_2")])
+    assert not pool.has_robot("id_1")
+    assert pool.has_robot("id_2")
 
 
-def test_robot_session_pool_tear_down(mock_mqtt_client, mock_inorbit_api):
+def test_robot_session_pool_tear_down(
+    mock_mqtt_client, mock_inorbit_api, fake_clock, mocker
+):
     factory = RobotSessionFactory(api_key="apikey_123")
     pool = RobotSessionPool(factory)
+    close_spy = mocker.spy(factory.http_session, "close")
 
     sess1 = pool.get_session("id_1", "name_1")
     sess1._is_disconnected = lambda: True
@@ -72,4 +70,19 @@ def test_robot_session_pool_tear_down(mock_mqtt_client, mock_inorbit_api):
 
     pool.tear_down()
 
-    assert all([not pool.has_robot("id_1"), not pool.has_robot("id_2")])
+    assert not pool.has_robot("id_1")
+    assert not pool.has_robot("id_2")
+    close_spy.assert_called_once()
+
+
+def test_robot_session_pool_get_existing_session_without_lock(
+    mock_mqtt_client, mock_inorbit_api, fake_clock, mocker
+):
+    factory = RobotSessionFactory(api_key="apikey_123")
+    pool = RobotSessionPool(factory)
+
+    robot1 = pool.get_session("id_1", "name_1")
+    pool.getting_session_mutex = mocker.MagicMock()
+
+    assert pool.get_session("id_1", "name_1") is robot1
+    pool.getting_session_mutex.__enter__.assert_not_called()
@@ -1,18 +1,14 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from inorbit_edge.robot import RobotSession
 from inorbit_edge.video import OpenCVCamera
 from inorbit_edge.robot import INORBIT_MODULE_CAMERAS
 
 
-def test_robot_session_register_camera(mock_mqtt_client, mock_inorbit_api, mocker):
+def test_robot_session_register_camera(robot_session, mock_inorbit_api, mocker):
     camera_id = "cam0"
     runlevel = 0
 
-    robot_session = RobotSession(
-        robot_id="id_123", robot_name="name_123", api_key="apikey_123"
-    )
     robot_session.connect()
 
     # TODO: Improve OpenCVCamera test. This `video_url` parameter causes an OpenCV
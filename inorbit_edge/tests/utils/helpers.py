@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from paho.mqtt.client import MQTTMessage
+from types import SimpleNamespace
 
 from inorbit_edge.inorbit_pb2 import CustomScriptCommandMessage
 
@@ -21,10 +21,12 @@ def test_robot_session_connect_helper(robot_session=None, mock_popen=None):
     # callback gets registered
     robot_session._on_connect(..., ..., ..., 0)
 
-    msg = MQTTMessage(topic=b"r/id_123/custom_command/script/command")
-    msg.payload = CustomScriptCommandMessage(
-        file_name="my_script.sh", arg_options=["a", "b"], execution_id="1"
-    ).SerializeToString()
+    msg = SimpleNamespace(
+        topic="r/id_123/custom_command/script/command",
+        payload=CustomScriptCommandMessage(
+            file_name="my_script.sh", arg_options=["a", "b"], execution_id="1"
+        ).SerializeToString(),
+    )
 
     robot_session._on_message(..., ..., msg)
 
@@ -144,11 +144,20 @@ class CameraStreamer:
         """This thread takes care of getting video from a camera at the desired rate,
         converting it to the right format and publishing the video frames"""
         self.camera.open()
+        # Frames are scheduled against a monotonic deadline, so the time spent
+        # converting and publishing them doesn't lower the streaming rate
+        next_frame_time = time.monotonic()
         while True:
             jpg, width, height, ts = self.camera.get_frame_jpg()
             if jpg is not None:
                 self.publish_frame(jpg, width, height, ts)
-            time.sleep(1.0 / self.camera.rate)
+            next_frame_time += 1.0 / self.camera.rate
+            now = time.monotonic()
+            if next_frame_time > now:
+                time.sleep(next_frame_time - now)
+            else:
+                # Fell behind, don't try to catch up with the missed frames
+                next_frame_time = now
             with self.mutex:
                 if self.must_stop:
                     break